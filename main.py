@@ -1,22 +1,142 @@
 import sys
+import abc
+import argparse
+import glob
+import os
+import gzip
+import hashlib
+import importlib.util
+import json
+import math
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
     QLabel, QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
-    QMessageBox, QHeaderView, QMenuBar, QFileDialog, QStyleOptionHeader, QStyle, QAction
+    QMessageBox, QHeaderView, QMenuBar, QFileDialog, QStyleOptionHeader, QStyle, QAction,
+    QActionGroup, QTableView, QTabWidget, QComboBox, QInputDialog
 )
-from PyQt5.QtCore import QRect, QRectF, Qt
+from PyQt5.QtCore import QRect, QRectF, Qt, QAbstractTableModel, QModelIndex
 from PyQt5.QtGui import QTextDocument
 from PyQt5.QtWidgets import QHeaderView, QStyleOptionHeader, QStyle
 from PyQt5.QtGui import QTextDocument
 from PyQt5.QtCore import QRect, Qt
+import numpy as np
 import pandas as pd
 import yfinance as yf
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 
 # Removed API_KEY and requests as we're using yfinance exclusively
 
-def get_stock_overview(symbol):
+class MarketDataSnapshot:
+    """In-memory copy of every overview, price and dividend response, keyed by symbol.
+
+    A snapshot is filled while recording and saved as gzip-compressed JSON, so a
+    later run can replay it without any network access.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, latency=0.0):
+        self.overviews = {}
+        self.prices = {}
+        self.dividends = {}
+        self.latency = latency
+        self.version = 0
+
+    def _simulate_latency(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def store_overview(self, symbol, info):
+        self.overviews[symbol] = dict(info)
+        self.version += 1
+
+    def store_price(self, symbol, price):
+        self.prices[symbol] = float(price) if price is not None else None
+        self.version += 1
+
+    def store_dividends(self, symbol, df):
+        if df.empty:
+            self.dividends[symbol] = {'tz': None, 'dates': [], 'values': []}
+        else:
+            dates = pd.DatetimeIndex(df['Date'])
+            self.dividends[symbol] = {
+                'tz': str(dates.tz) if dates.tz is not None else None,
+                'dates': [d.isoformat() for d in dates],
+                'values': [float(v) for v in df['Dividend']]
+            }
+        self.version += 1
+
+    def has(self, symbol):
+        return symbol in self.overviews and symbol in self.prices and symbol in self.dividends
+
+    def overview(self, symbol):
+        self._simulate_latency()
+        return dict(self.overviews.get(symbol, {}))
+
+    def price(self, symbol):
+        self._simulate_latency()
+        return self.prices.get(symbol)
+
+    def dividend_events(self, symbol):
+        self._simulate_latency()
+        record = self.dividends.get(symbol)
+        if not record or not record['dates']:
+            return pd.DataFrame()
+        if record['tz']:
+            dates = pd.to_datetime(record['dates'], utc=True).tz_convert(record['tz'])
+        else:
+            dates = pd.to_datetime(record['dates'])
+        # Callers mutate the frame they get back, so always build a fresh one
+        return pd.DataFrame({'Date': dates, 'Dividend': record['values']})
+
+    def save(self, path):
+        payload = {
+            'format': self.FORMAT_VERSION,
+            'recorded_at': pd.Timestamp.now(tz='UTC').isoformat(),
+            'overviews': self.overviews,
+            'prices': self.prices,
+            'dividends': self.dividends
+        }
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            json.dump(payload, f, default=str, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path, latency=0.0):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            payload = json.load(f)
+        if payload.get('format') != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format: {payload.get('format')}")
+        snapshot = cls(latency=latency)
+        snapshot.overviews = payload.get('overviews', {})
+        snapshot.prices = payload.get('prices', {})
+        snapshot.dividends = payload.get('dividends', {})
+        snapshot.version = 1
+        return snapshot
+
+
+# Active snapshot and mode: None (live), 'record' (fetch each symbol once and keep
+# the responses) or 'replay' (serve only from the snapshot)
+market_snapshot = None
+market_data_mode = None
+
+def start_recording():
+    global market_snapshot, market_data_mode
+    market_snapshot = MarketDataSnapshot()
+    market_data_mode = 'record'
+    return market_snapshot
+
+def start_replay(path, latency=0.0):
+    global market_snapshot, market_data_mode
+    market_snapshot = MarketDataSnapshot.load(path, latency=latency)
+    market_data_mode = 'replay'
+    return market_snapshot
+
+def fetch_stock_overview(symbol):
     stock = yf.Ticker(symbol)
     try:
         info = stock.info
@@ -24,7 +144,7 @@ def get_stock_overview(symbol):
     except Exception as e:
         return {}
 
-def get_current_price(symbol):
+def fetch_current_price(symbol):
     stock = yf.Ticker(symbol)
     try:
         data = stock.history(period='1d')
@@ -35,7 +155,7 @@ def get_current_price(symbol):
     except Exception as e:
         return None
 
-def get_dividend_events(symbol):
+def fetch_dividend_events(symbol):
     stock = yf.Ticker(symbol)
     dividends = stock.dividends
     if not dividends.empty:
@@ -45,6 +165,1257 @@ def get_dividend_events(symbol):
     else:
         return pd.DataFrame()
 
+def get_stock_overview(symbol):
+    if market_data_mode == 'replay' or (market_data_mode == 'record' and symbol in market_snapshot.overviews):
+        return market_snapshot.overview(symbol)
+    info = fetch_stock_overview(symbol)
+    if market_data_mode == 'record':
+        market_snapshot.store_overview(symbol, info)
+    return info
+
+def get_current_price(symbol):
+    if market_data_mode == 'replay' or (market_data_mode == 'record' and symbol in market_snapshot.prices):
+        return market_snapshot.price(symbol)
+    price = fetch_current_price(symbol)
+    if market_data_mode == 'record':
+        market_snapshot.store_price(symbol, price)
+    return price
+
+def get_dividend_events(symbol):
+    if market_data_mode == 'replay' or (market_data_mode == 'record' and symbol in market_snapshot.dividends):
+        return market_snapshot.dividend_events(symbol)
+    df = fetch_dividend_events(symbol)
+    if market_data_mode == 'record':
+        market_snapshot.store_dividends(symbol, df)
+    return df
+
+def snapshot_market_data(symbols, max_workers=8):
+    """Fetch overview, price and dividends for every symbol concurrently into a new snapshot."""
+    snapshot = MarketDataSnapshot()
+
+    def fetch(symbol):
+        return symbol, fetch_stock_overview(symbol), fetch_current_price(symbol), fetch_dividend_events(symbol)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for symbol, overview, price, dividends in executor.map(fetch, sorted(set(symbols))):
+            snapshot.store_overview(symbol, overview)
+            snapshot.store_price(symbol, price)
+            snapshot.store_dividends(symbol, dividends)
+    snapshot.version = (market_snapshot.version if market_snapshot is not None else 0) + 1
+    return snapshot
+
+def prefetch_market_data(symbols, refresh=False):
+    """Fetch market data for all ``symbols`` concurrently into the recording snapshot.
+
+    Symbols already recorded are skipped unless ``refresh`` is set. Does
+    nothing unless a recording is active.
+    """
+    if market_data_mode != 'record':
+        return
+    symbols = sorted(set(symbols)) if refresh else sorted(
+        {symbol for symbol in symbols if not market_snapshot.has(symbol)})
+    if not symbols:
+        return
+    fetched = snapshot_market_data(symbols)
+    market_snapshot.overviews.update(fetched.overviews)
+    market_snapshot.prices.update(fetched.prices)
+    market_snapshot.dividends.update(fetched.dividends)
+    market_snapshot.version += 1
+
+def use_snapshot(snapshot):
+    """Serve all market data from ``snapshot`` from now on."""
+    global market_snapshot, market_data_mode
+    market_snapshot = snapshot
+    market_data_mode = 'replay'
+
+
+# Tax-lot accounting over broker transaction exports
+
+LOT_EPSILON = 1e-9
+
+def _numeric_column(df, column, default=0.0):
+    if column not in df.columns:
+        return pd.Series(default, index=df.index, dtype=float)
+    return pd.to_numeric(df[column], errors='coerce').fillna(default)
+
+def parse_transaction_times(times):
+    # Exports mix timestamps with and without milliseconds
+    return pd.to_datetime(times, format='ISO8601')
+
+def merge_transaction_frames(frames):
+    """Concatenate transaction exports, dropping rows that appear in more than one file.
+
+    Rows are identified by their broker ``ID``; rows without one (dividends,
+    interest) are deduplicated on their full contents.
+    """
+    frames = [frame for frame in frames if frame is not None and not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True)
+    if 'ID' in df.columns:
+        has_id = df['ID'].notna() & (df['ID'].astype(str) != '')
+        df = pd.concat([
+            df[has_id].drop_duplicates(subset='ID'),
+            df[~has_id].drop_duplicates()
+        ])
+    else:
+        df = df.drop_duplicates()
+    order = parse_transaction_times(df['Time']).argsort(kind='stable')
+    return df.iloc[order].reset_index(drop=True)
+
+def read_transaction_file(path):
+    return pd.read_csv(path)
+
+def load_transaction_files(source, max_workers=None):
+    """Parse many broker exports in parallel and merge them into one deduplicated ledger.
+
+    ``source`` is a directory (every ``*.csv`` in it), a glob pattern or a list
+    of paths. Files are parsed in a process pool; rows repeated across
+    overlapping export windows are dropped and the result is in time order.
+    """
+    if isinstance(source, str):
+        pattern = os.path.join(source, '*.csv') if os.path.isdir(source) else source
+        paths = sorted(glob.glob(pattern))
+    else:
+        paths = list(source)
+    if len(paths) <= 1:
+        frames = [read_transaction_file(path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            frames = list(executor.map(read_transaction_file, paths))
+    return merge_transaction_frames(frames)
+
+def normalize_trades(df):
+    """Reduce a transaction export to buys and sells in split-adjusted share units.
+
+    Returns a frame sorted by symbol and time with the columns Symbol, Time,
+    Side ('buy' or 'sell'), Shares, Amount and Order ID. Share counts are
+    multiplied by every later stock split so lots opened before a split can be
+    matched directly against sells after it.
+    """
+    action = df['Action'].fillna('')
+    side = np.select(
+        [action.str.endswith(' buy'), action.str.endswith(' sell')], ['buy', 'sell'], default=''
+    )
+    fee = _numeric_column(df, 'Currency conversion fee')
+    total = _numeric_column(df, 'Total')
+    trades = pd.DataFrame({
+        'Symbol': df['Ticker'],
+        'Time': parse_transaction_times(df['Time']),
+        'Side': side,
+        'Shares': _numeric_column(df, 'No. of shares'),
+        # Fees raise the cost of a buy and lower the proceeds of a sell
+        'Amount': np.where(side == 'buy', total + fee, total - fee),
+        'Order ID': df['ID'].fillna('') if 'ID' in df.columns else ''
+    })
+    trades = trades[(trades['Side'] != '') & (trades['Shares'] > 0)].dropna(subset=['Symbol', 'Time'])
+
+    # Split ratio per (symbol, day): new share count over old share count
+    splits = df[action.isin(['Stock split open', 'Stock split close'])]
+    if not splits.empty:
+        splits = pd.DataFrame({
+            'Symbol': splits['Ticker'],
+            'Time': parse_transaction_times(splits['Time']),
+            'Open': np.where(splits['Action'] == 'Stock split open', _numeric_column(splits, 'No. of shares'), 0.0),
+            'Close': np.where(splits['Action'] == 'Stock split close', _numeric_column(splits, 'No. of shares'), 0.0)
+        })
+        splits = splits.groupby(['Symbol', splits['Time'].dt.normalize().rename('Day')]).agg(
+            Time=('Time', 'max'), Open=('Open', 'sum'), Close=('Close', 'sum')
+        ).reset_index(level='Symbol').reset_index(drop=True)
+        splits['Factor'] = np.where((splits['Open'] > 0) & (splits['Close'] > 0), splits['Open'] / splits['Close'], 1.0)
+        splits = splits.sort_values('Time')
+        # Cumulative factor of this split and every later one for the same symbol
+        splits['Adjustment'] = splits.iloc[::-1].groupby('Symbol')['Factor'].cumprod()
+        trades = pd.merge_asof(
+            trades.sort_values('Time'), splits[['Symbol', 'Time', 'Adjustment']],
+            on='Time', by='Symbol', direction='forward', allow_exact_matches=False
+        )
+        trades['Shares'] *= trades['Adjustment'].fillna(1.0)
+        trades = trades.drop(columns='Adjustment')
+
+    return trades.sort_values(['Symbol', 'Time'], kind='stable').reset_index(drop=True)
+
+def _match_fifo(buy_qty, buy_time, sell_qty, sell_time):
+    cum_buy = np.cumsum(buy_qty)
+    cum_sell = np.cumsum(sell_qty)
+    # A sell can only consume shares bought before it; anything beyond that is left unmatched
+    available = np.concatenate(([0.0], cum_buy))[np.searchsorted(buy_time, sell_time, side='right')]
+    sold = cum_sell + np.minimum(np.minimum.accumulate(available - cum_sell), 0.0)
+    total_sold = sold[-1] if len(sold) else 0.0
+
+    # Both sides laid out on one cumulative share axis; every segment between
+    # consecutive boundaries belongs to exactly one buy and one sell
+    edges = np.unique(np.concatenate(([0.0], cum_buy, sold)))
+    edges = edges[edges <= total_sold]
+    qty = np.diff(edges)
+    mid = edges[:-1] + qty / 2
+    keep = qty > LOT_EPSILON
+    buy_idx = np.searchsorted(cum_buy, mid[keep], side='right')
+    sell_idx = np.searchsorted(sold, mid[keep], side='right')
+    remaining = np.clip(cum_buy - np.maximum(cum_buy - buy_qty, total_sold), 0.0, None)
+    return buy_idx, sell_idx, qty[keep], remaining
+
+def _match_lifo(buy_qty, buy_time, sell_qty, sell_time):
+    remaining = buy_qty.tolist()
+    buy_time = buy_time.tolist()
+    buy_idx, sell_idx, qty = [], [], []
+    stack = []
+    next_buy = 0
+    for j, (quantity, sold_at) in enumerate(zip(sell_qty.tolist(), sell_time.tolist())):
+        while next_buy < len(buy_time) and buy_time[next_buy] <= sold_at:
+            stack.append(next_buy)
+            next_buy += 1
+        while quantity > LOT_EPSILON and stack:
+            i = stack[-1]
+            taken = min(quantity, remaining[i])
+            buy_idx.append(i)
+            sell_idx.append(j)
+            qty.append(taken)
+            remaining[i] -= taken
+            quantity -= taken
+            if remaining[i] <= LOT_EPSILON:
+                stack.pop()
+    return np.array(buy_idx, dtype=int), np.array(sell_idx, dtype=int), np.array(qty, dtype=float), np.array(remaining)
+
+LOT_MATCHERS = {'FIFO': _match_fifo, 'LIFO': _match_lifo}
+
+def build_tax_lots(df, method='FIFO'):
+    """Match sells against buys per symbol and return ``(open_lots, realized)``.
+
+    ``open_lots`` has one row per lot still held (Symbol, Open Date, Order ID,
+    Shares, Cost) and ``realized`` one row per matched lot slice (Symbol,
+    Open Date, Close Date, Buy Order ID, Sell Order ID, Shares, Cost, Proceeds,
+    Realized P&L). Share counts are in today's split-adjusted units.
+    """
+    match = LOT_MATCHERS[method]
+    trades = normalize_trades(df) if not df.empty else pd.DataFrame()
+    open_parts, realized_parts = [], []
+    if not trades.empty:
+        for symbol, group in trades.groupby('Symbol', sort=False):
+            buys = group[group['Side'] == 'buy']
+            sells = group[group['Side'] == 'sell']
+            buy_qty = buys['Shares'].to_numpy(dtype=float)
+            buy_cost = buys['Amount'].to_numpy(dtype=float)
+            buy_time = buys['Time'].to_numpy()
+            sell_qty = sells['Shares'].to_numpy(dtype=float)
+            sell_amount = sells['Amount'].to_numpy(dtype=float)
+            sell_time = sells['Time'].to_numpy()
+            buy_idx, sell_idx, qty, remaining = match(buy_qty, buy_time, sell_qty, sell_time)
+
+            if len(qty):
+                cost = qty * buy_cost[buy_idx] / buy_qty[buy_idx]
+                proceeds = qty * sell_amount[sell_idx] / sell_qty[sell_idx]
+                realized_parts.append(pd.DataFrame({
+                    'Symbol': symbol,
+                    'Open Date': buy_time[buy_idx],
+                    'Close Date': sell_time[sell_idx],
+                    'Buy Order ID': buys['Order ID'].to_numpy()[buy_idx],
+                    'Sell Order ID': sells['Order ID'].to_numpy()[sell_idx],
+                    'Shares': qty,
+                    'Cost': cost,
+                    'Proceeds': proceeds,
+                    'Realized P&L': proceeds - cost
+                }))
+            held = remaining > LOT_EPSILON
+            if held.any():
+                open_parts.append(pd.DataFrame({
+                    'Symbol': symbol,
+                    'Open Date': buy_time[held],
+                    'Order ID': buys['Order ID'].to_numpy()[held],
+                    'Shares': remaining[held],
+                    'Cost': remaining[held] * buy_cost[held] / buy_qty[held]
+                }))
+
+    open_lots = pd.concat(open_parts, ignore_index=True) if open_parts else pd.DataFrame(
+        columns=['Symbol', 'Open Date', 'Order ID', 'Shares', 'Cost'])
+    realized = pd.concat(realized_parts, ignore_index=True) if realized_parts else pd.DataFrame(
+        columns=['Symbol', 'Open Date', 'Close Date', 'Buy Order ID', 'Sell Order ID',
+                 'Shares', 'Cost', 'Proceeds', 'Realized P&L'])
+    return open_lots, realized
+
+def unrealized_lot_pl(open_lots, prices):
+    """Add Live Price, Market Value and Unrealized P&L columns to ``open_lots``."""
+    lots = open_lots.copy()
+    lots['Live Price'] = lots['Symbol'].map(prices).astype(float)
+    lots['Market Value'] = lots['Shares'] * lots['Live Price']
+    lots['Unrealized P&L'] = lots['Market Value'] - lots['Cost']
+    return lots
+
+
+def ledger_purchases(ledger):
+    """Buy transactions of ``ledger`` in the columns shown in the detail window, plus Symbol."""
+    action = ledger['Action'].fillna('')
+    buys = ledger[action.str.endswith(' buy')]
+    currency_conversion_fee = _numeric_column(buys, 'Currency conversion fee')
+    # Add currency conversion fee to total cost
+    total_cost = _numeric_column(buys, 'Total') + currency_conversion_fee
+    exchange_rate = _numeric_column(buys, 'Exchange rate', default=1.0).replace(0, 1.0)
+    return pd.DataFrame({
+        'Symbol': buys['Ticker'],
+        'Purchase Date': parse_transaction_times(buys['Time']).dt.date,
+        'Order ID': buys['ID'].fillna('') if 'ID' in buys.columns else '',
+        'ISIN': buys['ISIN'].fillna('') if 'ISIN' in buys.columns else '',
+        'Purchase Price $': _numeric_column(buys, 'Price / share'),
+        'Purchase Price €': total_cost,  # Assuming total_cost is in EUR
+        'Qty. Shares': _numeric_column(buys, 'No. of shares'),
+        'Value EUR': total_cost,
+        'Currency exchange': exchange_rate,
+        'Broker FX Fee EUR': currency_conversion_fee,
+        'Consideration $': total_cost / exchange_rate
+    })
+
+def ledger_dividends(ledger):
+    """Dividend payments of ``ledger`` in the columns shown in the detail window, plus Symbol."""
+    action = ledger['Action'].fillna('')
+    dividend_rows = ledger[action.str.contains('Dividend')]
+    amount = _numeric_column(dividend_rows, 'Total')
+    return pd.DataFrame({
+        'Symbol': dividend_rows['Ticker'],
+        'Date': parse_transaction_times(dividend_rows['Time']).dt.date,
+        'Dividend Received $': amount,
+        'Dividend Received EUR': amount * 0.9,  # Assuming exchange rate
+        'Comments': dividend_rows['Notes'].fillna('') if 'Notes' in dividend_rows.columns else ''
+    })
+
+def holdings_from_ledger(ledger, method='FIFO', current_portfolio=()):
+    """Build holdings and the imported dividend history from a transaction ledger.
+
+    Returns ``(portfolio, dividend_history)``. Holdings in ``current_portfolio``
+    that never traded in the ledger are kept as they are. Holdings carry totals
+    and open lots only; the individual purchases and payments stay in the
+    ledger, see ``ledger_purchases`` and ``ledger_dividends``.
+    """
+    open_lots, realized = build_tax_lots(ledger, method)
+
+    dividends = ledger_dividends(ledger)
+    dividend_history = dividends.rename(
+        columns={'Dividend Received $': 'Dividend'}
+    )[['Date', 'Symbol', 'Dividend']].to_dict('records')
+    dividends_by_symbol = dividends.groupby('Symbol')['Dividend Received $'].sum().to_dict()
+
+    lots_by_symbol = {
+        symbol: group.drop(columns='Symbol').to_dict('records')
+        for symbol, group in open_lots.groupby('Symbol', sort=False)
+    }
+    realized_by_symbol = realized.groupby('Symbol')['Realized P&L'].sum().to_dict()
+
+    # Holdings from the ledger replace any earlier entry for the same symbol;
+    # fully sold positions drop out of the portfolio
+    traded_symbols = set(open_lots['Symbol']) | set(realized['Symbol'])
+    existing = {stock['symbol']: stock for stock in current_portfolio}
+    symbols = [stock['symbol'] for stock in current_portfolio]
+    symbols += [symbol for symbol in lots_by_symbol if symbol not in existing]
+    portfolio = []
+    for symbol in symbols:
+        stock = existing.get(symbol)
+        if symbol not in traded_symbols:
+            portfolio.append(stock)
+            continue
+        lots = lots_by_symbol.get(symbol)
+        if not lots:
+            continue
+        if stock is None or not stock.get('company_name'):
+            # Fetch company name and sector
+            overview = get_stock_overview(symbol)
+            company_name = overview.get('longName', '')
+            sector = overview.get('sector', '')
+        else:
+            company_name = stock['company_name']
+            sector = stock.get('sector', '')
+        shares = sum(lot['Shares'] for lot in lots)
+        portfolio.append({
+            'symbol': symbol,
+            'company_name': company_name,
+            'sector': sector,
+            'shares': shares,
+            'cost_basis': sum(lot['Cost'] for lot in lots) / shares,
+            'total_dividends': dividends_by_symbol.get(symbol, 0.0),
+            'lots': lots,
+            'realized_pl': realized_by_symbol.get(symbol, 0.0)
+        })
+    return portfolio, dividend_history
+
+
+# Dividend reconciliation of received payments against announced dividends
+
+def collect_dividend_events(symbols):
+    """Return the dividend history of ``symbols`` as one frame with Symbol, Ex-Date and Dividend / Share."""
+    frames = []
+    for symbol in symbols:
+        events = get_dividend_events(symbol)
+        if events.empty:
+            continue
+        dates = pd.to_datetime(events['Date'])
+        if dates.dt.tz is not None:
+            # Keep the exchange-local calendar date; exchanges differ in timezone,
+            # so this has to happen before the symbols are combined
+            dates = dates.dt.tz_localize(None)
+        frames.append(pd.DataFrame({
+            'Symbol': symbol,
+            'Ex-Date': dates.dt.normalize(),
+            'Dividend / Share': events['Dividend'].astype(float)
+        }))
+    if not frames:
+        return pd.DataFrame(columns=['Symbol', 'Ex-Date', 'Dividend / Share'])
+    return pd.concat(frames, ignore_index=True)
+
+def share_positions(ledger):
+    """Return the running share count per symbol after every trade, in split-adjusted units."""
+    trades = normalize_trades(ledger)
+    signed = pd.Series(np.where(trades['Side'] == 'buy', trades['Shares'], -trades['Shares']), index=trades.index)
+    running = signed.groupby(trades['Symbol']).cumsum()
+    # Sells beyond the shares held match nothing, as in the lot matcher, so the
+    # running total restarts from zero instead of carrying the shortfall
+    shortfall = running.groupby(trades['Symbol']).cummin().clip(upper=0)
+    trades['Position'] = running - shortfall
+    return trades[['Symbol', 'Time', 'Position']].sort_values('Time', kind='stable')
+
+def reconcile_dividends(ledger, events=None, withholding_rate=0.15, tolerance=0.01,
+                        max_payment_lag_days=90, grace_days=45, as_of=None):
+    """Compare dividends received in ``ledger`` with the dividends expected from ``events``.
+
+    Shares held on each ex-date are reconstructed from the ledger with an as-of
+    join, and every received payment is joined to the latest ex-date before it.
+    Amounts are in the instrument currency except Received Net EUR. The Status
+    column is one of OK, Share mismatch, Amount mismatch, Withholding mismatch,
+    Net mismatch, Missing, Pending or Unexpected.
+    """
+    action = ledger['Action'].fillna('')
+    rows = ledger[action.str.contains('Dividend')]
+    received = pd.DataFrame({
+        'Symbol': rows['Ticker'],
+        'Paid Date': parse_transaction_times(rows['Time']),
+        'Received Shares': _numeric_column(rows, 'No. of shares'),
+        'Received / Share': _numeric_column(rows, 'Price / share'),
+        'Received Withholding': _numeric_column(rows, 'Withholding tax'),
+        'Received Net EUR': _numeric_column(rows, 'Total')
+    }).dropna(subset=['Symbol', 'Paid Date'])
+    received['Received Gross'] = received['Received Shares'] * received['Received / Share']
+    received['Received Net'] = received['Received Gross'] - received['Received Withholding']
+
+    positions = share_positions(ledger)
+    if events is None:
+        # Payments can arrive for positions opened before the ledger starts
+        events = collect_dividend_events(sorted(set(positions['Symbol']) | set(received['Symbol'])))
+
+    # Shares held at the close before each ex-date
+    expected = pd.merge_asof(
+        events.sort_values('Ex-Date'), positions.rename(columns={'Time': 'Ex-Date'}),
+        on='Ex-Date', by='Symbol', direction='backward', allow_exact_matches=False
+    ).rename(columns={'Position': 'Expected Shares'})
+    expected['Expected Shares'] = expected['Expected Shares'].fillna(0.0)
+
+    # Each payment belongs to the latest ex-date preceding it
+    matched = pd.merge_asof(
+        received.sort_values('Paid Date'), expected.sort_values('Ex-Date'),
+        left_on='Paid Date', right_on='Ex-Date', by='Symbol', direction='backward',
+        tolerance=pd.Timedelta(days=max_payment_lag_days)
+    )
+    paid_events = matched[['Symbol', 'Ex-Date']].dropna().drop_duplicates()
+    unpaid = expected.merge(paid_events, on=['Symbol', 'Ex-Date'], how='left', indicator=True)
+    unpaid = unpaid[(unpaid['_merge'] == 'left_only') & (unpaid['Expected Shares'] > LOT_EPSILON)]
+    report = pd.concat([matched, unpaid.drop(columns='_merge')], ignore_index=True)
+
+    report['Expected Gross'] = report['Expected Shares'] * report['Dividend / Share']
+    report['Expected Withholding'] = report['Expected Gross'] * withholding_rate
+    report['Expected Net'] = report['Expected Gross'] - report['Expected Withholding']
+
+    as_of = pd.Timestamp.now().normalize() if as_of is None else pd.Timestamp(as_of)
+    has_payment = report['Paid Date'].notna()
+    has_event = report['Ex-Date'].notna()
+    overdue = report['Ex-Date'] < as_of - pd.Timedelta(days=grace_days)
+    share_gap = (report['Received Shares'] - report['Expected Shares']).abs()
+    per_share_gap = (report['Received / Share'] - report['Dividend / Share']).abs()
+    withholding_gap = (report['Received Withholding'] - report['Received Gross'] * withholding_rate).abs()
+    net_gap = (report['Received Net'] - report['Expected Net']).abs()
+    report['Status'] = np.select(
+        [
+            ~has_event,
+            ~has_payment & overdue,
+            ~has_payment,
+            share_gap > LOT_EPSILON + 1e-6,
+            per_share_gap > tolerance * report['Dividend / Share'].abs(),
+            withholding_gap > tolerance * report['Received Gross'].abs() + 0.01,
+            net_gap > tolerance * report['Expected Net'].abs() + 0.01
+        ],
+        ['Unexpected', 'Missing', 'Pending', 'Share mismatch', 'Amount mismatch', 'Withholding mismatch',
+         'Net mismatch'],
+        default='OK'
+    )
+    columns = [
+        'Symbol', 'Ex-Date', 'Paid Date', 'Expected Shares', 'Received Shares', 'Dividend / Share',
+        'Received / Share', 'Expected Gross', 'Received Gross', 'Expected Withholding',
+        'Received Withholding', 'Expected Net', 'Received Net', 'Received Net EUR', 'Status'
+    ]
+    order = report['Ex-Date'].fillna(report['Paid Date'])
+    return report.iloc[order.argsort(kind='stable')][columns].reset_index(drop=True)
+
+
+# Per-holding valuation and group rollups
+
+def _group_label(value, default='Unknown'):
+    # Blank CSV cells arrive as NaN, which is truthy and never equal to itself
+    if value is None or value == '' or pd.isna(value):
+        return default
+    return value
+
+def value_holding(stock):
+    """Fetch market data for one holding and return its valuation figures, or None without a price."""
+    symbol = stock['symbol']
+    shares = stock['shares']
+    cost_basis = stock['cost_basis']
+    total_dividends = stock.get('total_dividends', 0.0)
+
+    # Fetch current price and dividend data
+    current_price = get_current_price(symbol)
+    overview = get_stock_overview(symbol)
+    if current_price is None:
+        return None
+
+    market_value = current_price * shares
+    book_value = cost_basis * shares
+    unrealized_gain = market_value - book_value
+    unrealized_gain_percent = (unrealized_gain / book_value) * 100 if book_value > 0 else 0
+    total_return = (unrealized_gain + total_dividends) / book_value * 100 if book_value > 0 else 0
+
+    dividend_per_share = float(overview.get('dividendRate', 0.0)) if overview.get('dividendRate') else 0.0
+    annual_dividend = dividend_per_share * shares
+    dividend_yield = (dividend_per_share / current_price) * 100 if current_price > 0 else 0.0
+
+    # Current Yield on Cost
+    current_yoc = (dividend_per_share / cost_basis) * 100 if cost_basis > 0 else 0.0
+
+    # Calculate Actual Dividend Growth
+    actual_dividend_growth = None
+    dividends_df = get_dividend_events(symbol)
+    if not dividends_df.empty:
+        dividends_df['Date'] = pd.to_datetime(dividends_df['Date'])
+        dividends_df['Year'] = dividends_df['Date'].dt.year
+        dividends_per_year = dividends_df.groupby('Year')['Dividend'].sum().sort_index()
+        if len(dividends_per_year) >= 2:
+            last_year_div = dividends_per_year.iloc[-1]
+            prev_year_div = dividends_per_year.iloc[-2]
+            if prev_year_div != 0:
+                actual_dividend_growth = ((last_year_div - prev_year_div) / prev_year_div) * 100
+
+    # Currency conversions (Assuming 1 USD = 0.9 EUR for example)
+    exchange_rate = 0.9  # Replace with actual rate or fetch dynamically
+    eur_cash_invested = book_value * exchange_rate
+    current_eur_value = market_value * exchange_rate
+    eur_unrealized_gain = current_eur_value - eur_cash_invested
+    eur_unrealized_gain_percent = (eur_unrealized_gain / eur_cash_invested) * 100 if eur_cash_invested > 0 else 0
+    eur_total_return = (eur_unrealized_gain + total_dividends * exchange_rate) / eur_cash_invested * 100 if eur_cash_invested > 0 else 0
+
+    return {
+        'symbol': symbol,
+        'company_name': stock.get('company_name', ''),
+        'sector': _group_label(stock.get('sector')),
+        'currency': _group_label(overview.get('currency')),
+        'account': _group_label(stock.get('account'), 'Default'),
+        'shares': shares,
+        'cost_basis': cost_basis,
+        'current_price': current_price,
+        'book_value': book_value,
+        'market_value': market_value,
+        'unrealized_gain': unrealized_gain,
+        'unrealized_gain_percent': unrealized_gain_percent,
+        'total_return': total_return,
+        'total_dividends': total_dividends,
+        'eur_cash_invested': eur_cash_invested,
+        'current_eur_value': current_eur_value,
+        'eur_unrealized_gain': eur_unrealized_gain,
+        'eur_unrealized_gain_percent': eur_unrealized_gain_percent,
+        'eur_total_return': eur_total_return,
+        'eur_total_dividends': total_dividends * exchange_rate,
+        'annual_dividend': annual_dividend,
+        'dividend_yield': dividend_yield,
+        'current_yoc': current_yoc,
+        'actual_dividend_growth': actual_dividend_growth
+    }
+
+
+class RollupIndex:
+    """Running totals per holding rolled up into sector, currency, account and portfolio groups.
+
+    Every holding belongs to the portfolio root plus one group per dimension,
+    so changing a holding applies its delta to a fixed handful of groups
+    instead of re-summing the portfolio.
+    """
+
+    DIMENSIONS = ('sector', 'currency', 'account')
+    MEASURES = ('book_value', 'current_value', 'dividends')
+    ROOT = ('portfolio', None)
+
+    def __init__(self):
+        self.holdings = {}
+        self.groups = {}
+
+    def _apply(self, groups, values, sign):
+        for group in groups:
+            totals = self.groups.setdefault(group, dict.fromkeys(self.MEASURES + ('count',), 0))
+            for measure in self.MEASURES:
+                totals[measure] += sign * values.get(measure, 0.0)
+            totals['count'] += sign
+            if totals['count'] == 0:
+                del self.groups[group]
+
+    def set_holding(self, key, values, **dimensions):
+        """Insert or replace a holding; ``dimensions`` names its sector, currency and account."""
+        groups = (self.ROOT,) + tuple(
+            (dimension, _group_label(dimensions.get(dimension))) for dimension in self.DIMENSIONS
+        )
+        values = {measure: float(values.get(measure, 0.0)) for measure in self.MEASURES}
+        entry = self.holdings.get(key)
+        if entry is not None and entry[0] == groups:
+            # Same groups, as after a price refresh: only the change is applied
+            self.update_holding(key, **values)
+            return
+        self.remove_holding(key)
+        self._apply(groups, values, 1)
+        self.holdings[key] = (groups, values)
+
+    def update_holding(self, key, **values):
+        """Change some measures of an existing holding, e.g. current_value after a price move."""
+        groups, old_values = self.holdings[key]
+        delta = {measure: values[measure] - old_values[measure] for measure in values}
+        for group in groups:
+            totals = self.groups[group]
+            for measure, change in delta.items():
+                totals[measure] += change
+        old_values.update(values)
+
+    def remove_holding(self, key):
+        entry = self.holdings.pop(key, None)
+        if entry is not None:
+            self._apply(*entry, -1)
+
+    def retain(self, keys):
+        for key in set(self.holdings) - set(keys):
+            self.remove_holding(key)
+
+    def holding(self, key):
+        return self.holdings[key][1]
+
+    def group_of(self, key, dimension):
+        return next(name for dim, name in self.holdings[key][0] if dim == dimension)
+
+    def total(self, dimension='portfolio', name=None):
+        return self.groups.get((dimension, name), dict.fromkeys(self.MEASURES + ('count',), 0.0))
+
+    def group_totals(self, dimension):
+        return {name: totals for (dim, name), totals in self.groups.items() if dim == dimension}
+
+    def share(self, key, dimension='portfolio', measure='current_value'):
+        """Fraction of its group's ``measure`` contributed by holding ``key``, in percent."""
+        name = None if dimension == 'portfolio' else self.group_of(key, dimension)
+        group_value = self.total(dimension, name)[measure]
+        return self.holding(key)[measure] / group_value * 100 if group_value > 0 else 0
+
+def value_portfolio(portfolio, rollup=None):
+    """Value every holding and feed the rollup; returns ``(valuations, rollup)`` for the priced holdings.
+
+    Rollup keys are ``(row position, symbol)`` so a symbol listed on several
+    rows keeps every row.
+    """
+    rollup = RollupIndex() if rollup is None else rollup
+    valuations = []
+    keys = []
+    for position, stock in enumerate(portfolio):
+        valuation = value_holding(stock)
+        key = (position, stock['symbol'])
+        keys.append(key)
+        if valuation is None:
+            # Unpriced holdings still count towards book value and dividends
+            rollup.set_holding(key, {
+                'book_value': stock['cost_basis'] * stock['shares'],
+                'dividends': stock.get('total_dividends', 0.0)
+            }, sector=stock.get('sector'), account=stock.get('account'))
+            continue
+        rollup.set_holding(key, {
+            'book_value': valuation['book_value'],
+            'current_value': valuation['market_value'],
+            'dividends': valuation['total_dividends']
+        }, sector=valuation['sector'], currency=valuation['currency'], account=valuation['account'])
+        valuations.append((key, valuation))
+    rollup.retain(keys)
+
+    for key, valuation in valuations:
+        valuation['portfolio_alloc_book'] = rollup.share(key, 'portfolio', 'book_value')
+        valuation['portfolio_alloc_live'] = rollup.share(key, 'portfolio', 'current_value')
+        valuation['sector_alloc_book'] = rollup.share(key, 'sector', 'book_value')
+        valuation['sector_alloc_live'] = rollup.share(key, 'sector', 'current_value')
+        valuation['dividends_in_portfolio'] = rollup.share(key, 'portfolio', 'dividends')
+    return [valuation for _, valuation in valuations], rollup
+
+CONSOLIDATED_VIEW = 'All Accounts'
+
+def consolidate_portfolios(portfolios):
+    """List the holdings of several named portfolios together, one row per portfolio and holding.
+
+    Each row keeps its own account, defaulting to the portfolio name, so the
+    rollup's account groups stay the real accounts.
+    """
+    return [
+        dict(stock, account=_group_label(stock.get('account'), name))
+        for name, holdings in portfolios.items() for stock in holdings
+    ]
+
+def merge_holdings(holdings):
+    """Combine rows of the same symbol into one holding for display."""
+    merged = {}
+    for stock in holdings:
+        entry = merged.get(stock['symbol'])
+        if entry is None:
+            merged[stock['symbol']] = dict(stock)
+            continue
+        shares = entry['shares'] + stock['shares']
+        total_cost = entry['cost_basis'] * entry['shares'] + stock['cost_basis'] * stock['shares']
+        entry['cost_basis'] = total_cost / shares if shares else 0.0
+        entry['shares'] = shares
+        entry['total_dividends'] = entry.get('total_dividends', 0.0) + stock.get('total_dividends', 0.0)
+        entry['realized_pl'] = entry.get('realized_pl', 0.0) + stock.get('realized_pl', 0.0)
+        entry['lots'] = entry.get('lots', []) + stock.get('lots', [])
+        if entry.get('account') != stock.get('account'):
+            entry['account'] = CONSOLIDATED_VIEW
+    return list(merged.values())
+
+VALUATION_TOTALS = (
+    'shares', 'book_value', 'market_value', 'unrealized_gain', 'total_dividends', 'eur_cash_invested',
+    'current_eur_value', 'eur_unrealized_gain', 'eur_total_dividends', 'annual_dividend',
+    'portfolio_alloc_book', 'portfolio_alloc_live', 'sector_alloc_book', 'sector_alloc_live',
+    'dividends_in_portfolio'
+)
+
+def merge_valuations(valuations):
+    """Combine valuations of the same symbol into one display row; ratios are recomputed from the sums."""
+    merged = {}
+    for valuation in valuations:
+        entry = merged.get(valuation['symbol'])
+        if entry is None:
+            merged[valuation['symbol']] = dict(valuation)
+            continue
+        for field in VALUATION_TOTALS:
+            entry[field] += valuation[field]
+        if entry['account'] != valuation['account']:
+            entry['account'] = CONSOLIDATED_VIEW
+    for entry in merged.values():
+        book_value = entry['book_value']
+        eur_cash_invested = entry['eur_cash_invested']
+        entry['cost_basis'] = book_value / entry['shares'] if entry['shares'] else 0.0
+        entry['unrealized_gain_percent'] = entry['unrealized_gain'] / book_value * 100 if book_value > 0 else 0
+        entry['total_return'] = (
+            (entry['unrealized_gain'] + entry['total_dividends']) / book_value * 100 if book_value > 0 else 0
+        )
+        entry['eur_unrealized_gain_percent'] = (
+            entry['eur_unrealized_gain'] / eur_cash_invested * 100 if eur_cash_invested > 0 else 0
+        )
+        entry['eur_total_return'] = (
+            (entry['eur_unrealized_gain'] + entry['eur_total_dividends']) / eur_cash_invested * 100
+            if eur_cash_invested > 0 else 0
+        )
+        entry['current_yoc'] = entry['annual_dividend'] / book_value * 100 if book_value > 0 else 0.0
+    return list(merged.values())
+
+def value_portfolios(portfolios, max_workers=None):
+    """Value several named portfolios in parallel; returns ``{name: (valuations, rollup)}``.
+
+    Market data for the combined symbol set is fetched once up front, so each
+    extra portfolio only adds computation.
+    """
+    prefetch_market_data({stock['symbol'] for holdings in portfolios.values() for stock in holdings})
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {name: executor.submit(value_portfolio, holdings) for name, holdings in portfolios.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+def portfolio_summary(rollup):
+    totals = rollup.total()
+    total_value_usd = totals['book_value']
+    total_live_usd = totals['current_value']
+    profit_loss_usd = total_live_usd - total_value_usd
+    total_dividends_usd = totals['dividends']
+
+    # Currency conversion
+    exchange_rate = 0.9  # Replace with actual rate or fetch dynamically
+    total_value_eur = total_value_usd * exchange_rate
+    total_live_eur = total_live_usd * exchange_rate
+    profit_loss_eur = total_live_eur - total_value_eur
+    total_dividends_eur = total_dividends_usd * exchange_rate
+
+    return {
+        'total_value_usd': total_value_usd,
+        'total_live_usd': total_live_usd,
+        'profit_loss_usd': profit_loss_usd,
+        'profit_loss_with_dividends_usd': profit_loss_usd + total_dividends_usd,
+        'total_dividends_usd': total_dividends_usd,
+        'total_value_eur': total_value_eur,
+        'total_live_eur': total_live_eur,
+        'profit_loss_eur': profit_loss_eur,
+        'profit_loss_with_dividends_eur': profit_loss_eur + total_dividends_eur,
+        'total_dividends_eur': total_dividends_eur,
+        # Dividend % in Portfolio
+        'dividend_percent_portfolio': (total_dividends_usd / total_value_usd * 100) if total_value_usd > 0 else 0
+    }
+
+def portfolio_ratios(portfolio):
+    # Placeholder calculations (implement actual calculations based on your data)
+    return {
+        'dividend_roi': 0.0,
+        'yearly_dividend_yield': 0.0,
+        'portfolio_growth': 0.0,
+        'monthly_dividend_growth': 0.0,
+        'yoy_monthly_dividend_growth': 0.0
+    }
+
+def dividend_calendar(portfolio, dividend_history):
+    """Imported dividends plus each holding's dividend history scaled to its share count."""
+    all_dividends = []
+
+    # Include imported dividend transactions
+    if dividend_history:
+        df_dividends = pd.DataFrame(dividend_history)
+        df_dividends['Date'] = pd.to_datetime(df_dividends['Date'])
+        all_dividends.append(df_dividends)
+
+    for stock in portfolio:
+        symbol = stock['symbol']
+        shares = stock['shares']
+
+        dividends = get_dividend_events(symbol)
+        if not dividends.empty:
+            dividends['Symbol'] = symbol
+            dividends['Dividend'] = dividends['Dividend'] * shares
+            all_dividends.append(dividends)
+
+    if not all_dividends:
+        return pd.DataFrame(columns=['Date', 'Symbol', 'Dividend'])
+
+    df = pd.concat(all_dividends, ignore_index=True)
+    # Imported dates are naive while yfinance dates carry the exchange timezone
+    df['Date'] = pd.to_datetime(df['Date'], utc=True)
+    return df.sort_values('Date')[['Date', 'Symbol', 'Dividend']].reset_index(drop=True)
+
+
+
+# Income reports
+
+# Optional libraries behind the report writers, by file extension
+REPORT_WRITERS = {
+    '.xlsx': ('Excel Workbook (*.xlsx)', 'openpyxl'),
+    '.parquet': ('Parquet Files (*.parquet)', 'pyarrow')
+}
+
+def report_writer_available(extension):
+    entry = REPORT_WRITERS.get(extension)
+    return entry is None or importlib.util.find_spec(entry[1]) is not None
+
+def write_report_xlsx(tables, path):
+    """Stream report tables into an XLSX workbook, one sheet per table, row by row."""
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    for name, frame in tables.items():
+        sheet = workbook.create_sheet(title=name[:31])
+        sheet.append([str(column) for column in frame.columns])
+        for row in frame.itertuples(index=False, name=None):
+            sheet.append([None if pd.isna(value) else value for value in row])
+    workbook.save(path)
+
+def write_report_parquet(tables, path, chunk_size=65536):
+    """Write each report table to ``<path stem>_<table>.parquet`` in row-group sized chunks."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    stem, _ = os.path.splitext(path)
+    paths = []
+    for name, frame in tables.items():
+        frame = frame.rename(columns=str)
+        schema = pa.Schema.from_pandas(frame, preserve_index=False)
+        table_path = f"{stem}_{name}.parquet"
+        with pq.ParquetWriter(table_path, schema) as writer:
+            for start in range(0, len(frame), chunk_size):
+                chunk = frame.iloc[start:start + chunk_size]
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        paths.append(table_path)
+    return paths
+
+
+class IncomeReportEngine:
+    """Dividend income pivots built from the ledger and cached reference data.
+
+    Overviews and dividend histories are fetched once per symbol and kept for
+    the session. Finished reports are memoized on a hash of the ledger, the
+    holdings and the market snapshot version, so repeating an export with
+    unchanged inputs does no work.
+    """
+
+    CACHE_SIZE = 8
+
+    def __init__(self):
+        self.overviews = {}
+        self.events = {}
+        self.reports = OrderedDict()
+
+    def load_reference(self, symbols):
+        for symbol in symbols:
+            if symbol not in self.overviews:
+                self.overviews[symbol] = get_stock_overview(symbol)
+            if symbol not in self.events:
+                self.events[symbol] = collect_dividend_events([symbol])
+
+    def clear(self):
+        self.overviews.clear()
+        self.events.clear()
+        self.reports.clear()
+
+    def cache_key(self, ledger, holdings, as_of):
+        if ledger.empty:
+            ledger_hash = ''
+        else:
+            hashes = pd.util.hash_pandas_object(ledger, index=False).to_numpy()
+            ledger_hash = hashlib.sha1(hashes.tobytes()).hexdigest()
+        holdings_key = tuple(
+            (stock['symbol'], float(stock['shares']), _group_label(stock.get('sector'), '')) for stock in holdings
+        )
+        version = market_snapshot.version if market_snapshot is not None else 0
+        return ledger_hash, holdings_key, version, as_of
+
+    def build(self, ledger, holdings, as_of=None):
+        """Return a dict of report tables for ``holdings`` and the received dividends in ``ledger``.
+
+        Tables: forward_12m (per holding estimate), monthly_income (month x
+        symbol), yearly_sector_income (year x sector), ttm_income (per symbol)
+        and forward_monthly_income (month x symbol for the next 12 months).
+        """
+        if ledger.empty:
+            received = pd.DataFrame({'Symbol': [], 'Date': pd.to_datetime([]), 'Amount': []})
+        else:
+            rows = ledger[ledger['Action'].str.contains('Dividend', na=False)]
+            received = pd.DataFrame({
+                'Symbol': rows['Ticker'],
+                'Date': parse_transaction_times(rows['Time']),
+                'Amount': _numeric_column(rows, 'Total')
+            })
+        symbols = list(dict.fromkeys([stock['symbol'] for stock in holdings] + list(received['Symbol'].dropna())))
+        self.load_reference(symbols)
+
+        # The trailing and forward windows move with as_of, so it is part of the key
+        as_of = pd.Timestamp.now().normalize() if as_of is None else pd.Timestamp(as_of).normalize()
+        key = self.cache_key(ledger, holdings, as_of)
+        if key in self.reports:
+            self.reports.move_to_end(key)
+            return self.reports[key]
+
+        year_ago = as_of - pd.DateOffset(years=1)
+        sectors = {symbol: self.overviews[symbol].get('sector') or 'Unknown' for symbol in symbols}
+        sectors.update({
+            stock['symbol']: _group_label(stock.get('sector'), sectors[stock['symbol']]) for stock in holdings
+        })
+        # A symbol can be listed on several rows
+        shares = pd.Series(
+            [float(stock['shares']) for stock in holdings], index=[stock['symbol'] for stock in holdings], dtype=float
+        ).groupby(level=0, sort=False).sum()
+
+        monthly_income = received.pivot_table(
+            index=received['Date'].dt.strftime('%Y-%m').rename('Month'), columns='Symbol',
+            values='Amount', aggfunc='sum', fill_value=0.0
+        ).reset_index()
+        yearly_sector_income = received.pivot_table(
+            index=received['Date'].dt.year.rename('Year'), columns=received['Symbol'].map(sectors).rename('Sector'),
+            values='Amount', aggfunc='sum', fill_value=0.0
+        ).reset_index()
+        ttm_income = received[received['Date'] > year_ago].groupby('Symbol')['Amount'].sum()
+        ttm_income = ttm_income.rename('TTM Income').reset_index()
+
+        # Dividends paid over the last year, projected one year ahead on today's share counts
+        events = pd.concat([self.events[symbol] for symbol in shares.index] or [pd.DataFrame(
+            columns=['Symbol', 'Ex-Date', 'Dividend / Share'])], ignore_index=True)
+        events['Ex-Date'] = pd.to_datetime(events['Ex-Date'])
+        recent = events[events['Ex-Date'] > year_ago]
+        projected = pd.DataFrame({
+            'Symbol': recent['Symbol'],
+            'Month': (recent['Ex-Date'] + pd.DateOffset(years=1)).dt.strftime('%Y-%m'),
+            'Amount': recent['Dividend / Share'].astype(float) * recent['Symbol'].map(shares)
+        })
+        forward_monthly_income = projected.pivot_table(
+            index='Month', columns='Symbol', values='Amount', aggfunc='sum', fill_value=0.0
+        ).reset_index()
+
+        # Forward dividend rate where known, otherwise the trailing year of dividends per share
+        trailing_rate = recent.groupby('Symbol')['Dividend / Share'].sum()
+        dividend_per_share = pd.Series({
+            symbol: float(self.overviews[symbol]['dividendRate']) if self.overviews[symbol].get('dividendRate')
+            else float(trailing_rate.get(symbol, 0.0))
+            for symbol in shares.index
+        }, dtype=float)
+        forward_12m = pd.DataFrame({
+            'Symbol': shares.index,
+            'Shares': shares.to_numpy(),
+            'Dividend Per Share': dividend_per_share.to_numpy(),
+            'Annual Dividend': (shares * dividend_per_share).to_numpy()
+        })
+
+        report = {
+            'forward_12m': forward_12m,
+            'monthly_income': monthly_income,
+            'yearly_sector_income': yearly_sector_income,
+            'ttm_income': ttm_income,
+            'forward_monthly_income': forward_monthly_income
+        }
+        self.reports[key] = report
+        if len(self.reports) > self.CACHE_SIZE:
+            self.reports.popitem(last=False)
+        return report
+
+
+# Dividend screener
+
+PAYOUT_FREQUENCIES = ['Monthly', 'Quarterly', 'Semi-annual', 'Annual', 'None']
+
+def build_screener_universe(snapshot, as_of=None):
+    """Flatten a market data snapshot into one row per ticker for screening.
+
+    Columns: Symbol, Name, Sector, Price, Dividend Rate, Yield %, Payout Ratio,
+    Growth Streak (consecutive years of higher total dividends), Payments (last
+    12 months) and Frequency. Dividend histories are concatenated into a single
+    long frame so every statistic is a grouped vector operation.
+    """
+    as_of = pd.Timestamp.now().normalize() if as_of is None else pd.Timestamp(as_of)
+    symbols = sorted(set(snapshot.overviews) | set(snapshot.dividends))
+    overviews = [snapshot.overviews.get(symbol, {}) for symbol in symbols]
+    universe = pd.DataFrame({
+        'Symbol': symbols,
+        'Name': [overview.get('longName') or overview.get('shortName') or '' for overview in overviews],
+        'Sector': [overview.get('sector') or 'Unknown' for overview in overviews],
+        'Price': pd.to_numeric(pd.Series(
+            [snapshot.prices.get(symbol) or overview.get('currentPrice') or overview.get('previousClose')
+             for symbol, overview in zip(symbols, overviews)]), errors='coerce'),
+        'Dividend Rate': pd.to_numeric(pd.Series([overview.get('dividendRate') for overview in overviews]), errors='coerce'),
+        'Payout Ratio': pd.to_numeric(pd.Series([overview.get('payoutRatio') for overview in overviews]), errors='coerce')
+    })
+
+    records = [snapshot.dividends.get(symbol) or {'dates': [], 'values': []} for symbol in symbols]
+    counts = [len(record['dates']) for record in records]
+    events = pd.DataFrame({
+        'Symbol': np.repeat(symbols, counts),
+        'Date': pd.to_datetime(
+            [date for record in records for date in record['dates']], utc=True
+        ).tz_localize(None),
+        'Dividend': np.array([value for record in records for value in record['values']], dtype=float)
+    })
+
+    # Trailing year: payment count and dividends per share
+    recent = events[events['Date'] > as_of - pd.DateOffset(years=1)].groupby('Symbol')['Dividend'].agg(['count', 'sum'])
+    payments = universe['Symbol'].map(recent['count']).fillna(0).astype(int)
+    trailing_rate = universe['Symbol'].map(recent['sum']).fillna(0.0)
+
+    # Growth streak over complete calendar years
+    annual = events[events['Date'].dt.year < as_of.year]
+    annual = annual.groupby(['Symbol', annual['Date'].dt.year.rename('Year')])['Dividend'].sum().reset_index()
+    grouped = annual.groupby('Symbol')
+    increased = (grouped['Dividend'].diff() > 0) & (grouped['Year'].diff() == 1)
+    position = grouped.cumcount()
+    last_break = position.where(~increased).groupby(annual['Symbol']).max()
+    streak = grouped.size() - 1 - last_break
+
+    rate = universe['Dividend Rate'].where(universe['Dividend Rate'] > 0, trailing_rate)
+    universe['Dividend Rate'] = rate
+    universe['Yield %'] = (rate / universe['Price'] * 100).where(universe['Price'] > 0)
+    universe['Growth Streak'] = universe['Symbol'].map(streak).fillna(0).astype(int)
+    universe['Payments'] = payments
+    universe['Frequency'] = np.select(
+        [payments >= 11, payments >= 3, payments == 2, payments == 1], PAYOUT_FREQUENCIES[:4], default='None'
+    )
+    return universe
+
+def screen_dividend_stocks(universe, min_yield=None, max_yield=None, min_streak=None, frequencies=None,
+                           sectors=None, max_payout_ratio=None, sort_by='Yield %', limit=None):
+    """Filter ``universe`` with vectorized predicates and rank by ``sort_by``, highest first."""
+    mask = np.ones(len(universe), dtype=bool)
+    if min_yield is not None:
+        mask &= (universe['Yield %'] >= min_yield).to_numpy()
+    if max_yield is not None:
+        mask &= (universe['Yield %'] <= max_yield).to_numpy()
+    if min_streak is not None:
+        mask &= (universe['Growth Streak'] >= min_streak).to_numpy()
+    if frequencies:
+        mask &= universe['Frequency'].isin(frequencies).to_numpy()
+    if sectors:
+        mask &= universe['Sector'].isin(sectors).to_numpy()
+    if max_payout_ratio is not None:
+        mask &= (universe['Payout Ratio'] <= max_payout_ratio).to_numpy()
+    result = universe[mask].sort_values(sort_by, ascending=False, na_position='last', kind='stable')
+    if limit is not None:
+        result = result.head(limit)
+    return result.reset_index(drop=True)
+
+
+# Local JSON API
+
+def _json_default(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value) if np.isfinite(value) else None
+    return str(value)
+
+def _json_safe(value):
+    # JSON has no NaN; numpy floats subclass float and would bypass _json_default
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if value is pd.NaT:
+        return None
+    return value
+
+
+class PortfolioAPIServer:
+    """Serves holdings, summary, ratios and the dividend calendar as JSON over HTTP.
+
+    The server answers from an in-memory market snapshot that is refreshed on
+    a timer, so clients never trigger yfinance requests themselves. Responses
+    are memoized per endpoint and snapshot version and carry an ETag for
+    conditional requests. Concurrent requests for a response that is still
+    being computed wait on the same task.
+    """
+
+    ENDPOINTS = ('holdings', 'summary', 'ratios', 'calendar')
+    STATUS_TEXT = {200: 'OK', 304: 'Not Modified', 404: 'Not Found', 405: 'Method Not Allowed',
+                   500: 'Internal Server Error'}
+
+    def __init__(self, portfolio, dividend_history=(), refresh_interval=300):
+        self.portfolio = portfolio
+        self.dividend_history = list(dividend_history)
+        self.refresh_interval = refresh_interval
+        # A replayed snapshot is fixed; otherwise the server owns its snapshots
+        self.live = market_data_mode != 'replay'
+        self.results = {}
+        self.pending = {}
+
+    @staticmethod
+    def market_version():
+        return market_snapshot.version if market_snapshot is not None else 0
+
+    async def refresh(self):
+        loop = asyncio.get_running_loop()
+        symbols = [stock['symbol'] for stock in self.portfolio]
+        snapshot = await loop.run_in_executor(None, snapshot_market_data, symbols)
+        use_snapshot(snapshot)
+        # Responses for older snapshots can no longer be requested
+        self.results = {key: value for key, value in self.results.items() if key[-1] == snapshot.version}
+
+    async def refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f'Market data refresh failed: {e}', file=sys.stderr)
+
+    async def memoized(self, key, factory):
+        if key in self.results:
+            return self.results[key]
+        task = self.pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self.pending[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        self.pending.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self.results[key] = task.result()
+
+    def in_thread(self, func, *args):
+        return lambda: asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def render(self, endpoint, version):
+        if endpoint in ('holdings', 'summary'):
+            valuations, rollup = await self.memoized(
+                ('valuation', version), self.in_thread(value_portfolio, self.portfolio)
+            )
+            if endpoint == 'holdings':
+                payload = valuations
+            else:
+                payload = dict(portfolio_summary(rollup))
+                for dimension in RollupIndex.DIMENSIONS:
+                    payload[f'{dimension}_totals'] = rollup.group_totals(dimension)
+        elif endpoint == 'ratios':
+            payload = portfolio_ratios(self.portfolio)
+        else:
+            calendar = await self.memoized(
+                ('calendar_data', version), self.in_thread(dividend_calendar, self.portfolio, self.dividend_history)
+            )
+            payload = calendar.to_dict('records')
+        body = json.dumps(_json_safe(payload), default=_json_default, allow_nan=False).encode('utf-8')
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        return etag, body
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            method, target, _ = request_line.decode('latin-1').split(' ', 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            endpoint = target.split('?', 1)[0].strip('/')
+            etag = None
+            if method not in ('GET', 'HEAD'):
+                status, body = 405, b'{"error": "method not allowed"}'
+            elif endpoint == '':
+                status, body = 200, json.dumps({'endpoints': [f'/{name}' for name in self.ENDPOINTS]}).encode('utf-8')
+            elif endpoint not in self.ENDPOINTS:
+                status, body = 404, b'{"error": "not found"}'
+            else:
+                version = self.market_version()
+                try:
+                    etag, body = await self.memoized((endpoint, version), lambda: self.render(endpoint, version))
+                    status = 304 if headers.get('if-none-match') == etag else 200
+                except Exception as e:
+                    status, body = 500, json.dumps({'error': str(e)}).encode('utf-8')
+            await self.respond(writer, status, body, etag, head=method == 'HEAD')
+        except (ValueError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, body, etag=None, head=False):
+        if status == 304:
+            body = b''
+        lines = [
+            f'HTTP/1.1 {status} {self.STATUS_TEXT[status]}',
+            'Content-Type: application/json',
+            f'Content-Length: {len(body)}',
+            'Cache-Control: no-cache',
+            'Connection: close'
+        ]
+        if etag:
+            lines.append(f'ETag: {etag}')
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if not head:
+            writer.write(body)
+        await writer.drain()
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        if self.live:
+            await self.refresh()
+            if self.refresh_interval:
+                asyncio.ensure_future(self.refresh_loop())
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f'Serving portfolio API on http://{host}:{port}/', file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
 
 
 class TextWrappingHeader(QHeaderView):
@@ -79,20 +1450,423 @@ class TextWrappingHeader(QHeaderView):
         painter.restore()
 
 
+def format_text(value):
+    return '' if pd.isna(value) else str(value)
+
+def format_date(value):
+    return '' if pd.isna(value) else str(pd.Timestamp(value).date())
+
+def format_number(decimals=2, prefix='', suffix=''):
+    return lambda value: '' if pd.isna(value) else f"{prefix}{value:.{decimals}f}{suffix}"
+
+
+class LedgerTableModel(QAbstractTableModel):
+    """Read-only table model over a ledger frame.
+
+    Rows are handed to the view in batches through canFetchMore/fetchMore and
+    cells are only formatted when the view paints them, so the cost of opening
+    a table does not grow with the ledger. Sorting and filtering reorder an
+    index array over the frame instead of the view's items.
+    """
+
+    BATCH_SIZE = 256
+
+    def __init__(self, frame, columns, parent=None):
+        # columns: list of (header, frame column, formatter)
+        super().__init__(parent)
+        self.frame = frame.reset_index(drop=True)
+        self.columns = columns
+        self.column_positions = [self.frame.columns.get_loc(column) for _, column, _ in columns]
+        self.visible = np.arange(len(self.frame))
+        self.loaded = min(self.BATCH_SIZE, len(self.visible))
+        self.sort_column = None
+        self.sort_order = Qt.AscendingOrder
+        self.filter_text = ''
+
+    def set_frame(self, frame):
+        self.frame = frame.reset_index(drop=True)
+        self.column_positions = [self.frame.columns.get_loc(column) for _, column, _ in self.columns]
+        self.refresh()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        value = self.frame.iat[self.visible[index.row()], self.column_positions[index.column()]]
+        return self.columns[index.column()][2](value)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.columns[section][0]
+        return str(section + 1)
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self.loaded < len(self.visible)
+
+    def fetchMore(self, parent):
+        count = min(self.BATCH_SIZE, len(self.visible) - self.loaded)
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        # Qt passes -1 to restore the frame's own order
+        self.sort_column = column if column >= 0 else None
+        self.sort_order = order
+        self.refresh()
+
+    def set_filter(self, text):
+        self.filter_text = text
+        self.refresh()
+
+    def refresh(self):
+        rows = self.frame
+        if self.filter_text:
+            mask = np.zeros(len(rows), dtype=bool)
+            for _, column, _ in self.columns:
+                mask |= rows[column].astype(str).str.contains(self.filter_text, case=False, regex=False).to_numpy()
+            rows = rows[mask]
+        if self.sort_column is not None:
+            keys = rows[self.columns[self.sort_column][1]]
+            ascending = self.sort_order == Qt.AscendingOrder
+            try:
+                keys = keys.sort_values(ascending=ascending, kind='stable', na_position='last')
+            except TypeError:
+                # Mixed types in an object column; fall back to text order
+                keys = keys.astype(str).sort_values(ascending=ascending, kind='stable')
+            rows = rows.loc[keys.index]
+        self.beginResetModel()
+        self.visible = rows.index.to_numpy()
+        self.loaded = min(self.BATCH_SIZE, len(self.visible))
+        self.endResetModel()
+
+
+class LedgerTableView(QWidget):
+    """Filter box above a sortable QTableView backed by a LedgerTableModel.
+
+    Rows keep the frame's order until a header is clicked, unless ``sort``
+    gives an initial (column, order).
+    """
+
+    def __init__(self, frame, columns, parent=None, sort=None):
+        super().__init__(parent)
+        self.model = LedgerTableModel(frame, columns, self)
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText('Filter...')
+        self.filter_input.textChanged.connect(self.model.set_filter)
+        layout.addWidget(self.filter_input)
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        # Enabling sorting applies the header's current indicator immediately
+        column, order = sort if sort is not None else (-1, Qt.AscendingOrder)
+        self.view.horizontalHeader().setSortIndicator(column, order)
+        self.view.setSortingEnabled(True)
+        self.view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.view)
+        self.setLayout(layout)
+
+
+class _AbstractWidgetMeta(type(QWidget), abc.ABCMeta):
+    # Widgets need sip's metaclass; ABCMeta adds abstract method checks on top
+    pass
+
+
+class ChartView(QWidget, metaclass=_AbstractWidgetMeta):
+    """A single figure and canvas reused for every redraw of one chart.
+
+    Figures are created directly rather than through pyplot so they never
+    enter its global registry. Subclasses update their artists in place, and
+    the rendered canvas is cached per data key so switching back to a
+    previously drawn state is a blit instead of a full redraw.
+    """
+
+    CACHE_SIZE = 8
+
+    def __init__(self, title, parent=None):
+        super().__init__(parent)
+        self.title = title
+        self.figure = Figure()
+        self.canvas = FigureCanvasQTAgg(self.figure)
+        self.ax = self.figure.add_subplot(111)
+        self.rendered = OrderedDict()
+        self.current_key = None
+        # Cached pixels are only valid for the canvas size they were drawn at
+        self.canvas.mpl_connect('resize_event', lambda event: self.rendered.clear())
+        layout = QVBoxLayout()
+        layout.addWidget(self.canvas)
+        self.setLayout(layout)
+
+    def show_data(self, labels, values):
+        key = (tuple(labels), tuple(np.round(np.asarray(values, dtype=float), 6)))
+        if key == self.current_key:
+            return
+        # Artists always track the data so a later full redraw stays correct
+        self.update_artists(list(labels), np.asarray(values, dtype=float))
+        self.current_key = key
+        cached = self.rendered.get(key)
+        if cached is not None:
+            self.rendered.move_to_end(key)
+            self.canvas.restore_region(cached)
+            self.canvas.blit(self.figure.bbox)
+            return
+        self.canvas.draw()
+        self.rendered[key] = self.canvas.copy_from_bbox(self.figure.bbox)
+        if len(self.rendered) > self.CACHE_SIZE:
+            self.rendered.popitem(last=False)
+
+    @abc.abstractmethod
+    def update_artists(self, labels, values):
+        """Bring the chart's artists in line with ``labels`` and ``values`` without drawing."""
+
+
+class PieChartView(ChartView):
+    def __init__(self, title, parent=None):
+        super().__init__(title, parent)
+        self.wedges = None
+
+    def update_artists(self, labels, values):
+        fractions = values / values.sum() if values.sum() > 0 else np.zeros_like(values)
+        if self.wedges is None or len(self.wedges[0]) != len(values):
+            self.ax.clear()
+            self.wedges = self.ax.pie(fractions * 100, labels=labels, autopct='%1.1f%%')
+            self.ax.axis('equal')
+            self.ax.set_title(self.title)
+            return
+        # Same number of slices: move the existing wedges and labels
+        bounds = np.concatenate(([0.0], np.cumsum(fractions))) * 360
+        for i, (wedge, text, autotext) in enumerate(zip(*self.wedges)):
+            wedge.set_theta1(bounds[i])
+            wedge.set_theta2(bounds[i + 1])
+            angle = np.deg2rad((bounds[i] + bounds[i + 1]) / 2)
+            x, y = np.cos(angle), np.sin(angle)
+            text.set_position((1.1 * x, 1.1 * y))
+            text.set_horizontalalignment('left' if x > 0 else 'right')
+            text.set_text(labels[i])
+            autotext.set_position((0.6 * x, 0.6 * y))
+            autotext.set_text(f"{fractions[i] * 100:.1f}%")
+
+
+class BarChartView(ChartView):
+    def __init__(self, title, ylabel='', parent=None):
+        super().__init__(title, parent)
+        self.ylabel = ylabel
+        self.bars = None
+        self.bar_labels = None
+
+    def update_artists(self, labels, values):
+        if self.bars is None or labels != self.bar_labels:
+            self.ax.clear()
+            self.bars = self.ax.bar(range(len(values)), values)
+            self.ax.set_xticks(range(len(values)))
+            self.ax.set_xticklabels(labels, rotation=90, fontsize='small')
+            self.ax.set_title(self.title)
+            self.ax.set_ylabel(self.ylabel)
+            self.figure.tight_layout()
+            self.bar_labels = labels
+            return
+        for bar, value in zip(self.bars, values):
+            bar.set_height(value)
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+
+class ChartsWindow(QWidget):
+    """Allocation, sector and monthly income charts fed from one set of aggregates."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('Portfolio Allocation')
+        self.tabs = QTabWidget()
+        self.allocation_chart = PieChartView('Portfolio Allocation')
+        self.sector_chart = PieChartView('Sector Allocation')
+        self.income_chart = BarChartView('Monthly Dividend Income', ylabel='Dividends ($)')
+        self.tabs.addTab(self.allocation_chart, 'Holdings')
+        self.tabs.addTab(self.sector_chart, 'Sectors')
+        self.tabs.addTab(self.income_chart, 'Monthly Income')
+        layout = QVBoxLayout()
+        layout.addWidget(self.tabs)
+        self.setLayout(layout)
+
+    def update_charts(self, aggregates):
+        for chart, series in (
+            (self.allocation_chart, aggregates['holdings']),
+            (self.sector_chart, aggregates['sectors']),
+            (self.income_chart, aggregates['monthly_income'])
+        ):
+            chart.show_data(list(series.index), series.to_numpy())
+
+
+class ScreenerWindow(QWidget):
+    """Screens a snapshot's ticker universe by yield, growth streak, payout frequency and sector."""
+
+    COLUMNS = [
+        ('Symbol', 'Symbol', format_text),
+        ('Name', 'Name', format_text),
+        ('Sector', 'Sector', format_text),
+        ('Price', 'Price', format_number(prefix='$')),
+        ('Dividend Rate', 'Dividend Rate', format_number(prefix='$')),
+        ('Yield %', 'Yield %', format_number(suffix='%')),
+        ('Payout Ratio', 'Payout Ratio', format_number()),
+        ('Growth Streak', 'Growth Streak', format_text),
+        ('Frequency', 'Frequency', format_text)
+    ]
+    SORT_BY = 'Yield %'
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('Dividend Screener')
+        self.universe = pd.DataFrame(columns=[column for _, column, _ in self.COLUMNS])
+
+        filters_layout = QHBoxLayout()
+        self.load_button = QPushButton('Load Snapshot...')
+        self.load_button.clicked.connect(self.load_snapshot)
+        filters_layout.addWidget(self.load_button)
+        self.min_yield_input = QLineEdit()
+        self.min_yield_input.setPlaceholderText('Min yield %')
+        filters_layout.addWidget(self.min_yield_input)
+        self.min_streak_input = QLineEdit()
+        self.min_streak_input.setPlaceholderText('Min growth streak (years)')
+        filters_layout.addWidget(self.min_streak_input)
+        self.frequency_input = QComboBox()
+        self.frequency_input.addItems(['Any frequency'] + PAYOUT_FREQUENCIES[:4])
+        filters_layout.addWidget(self.frequency_input)
+        self.sector_input = QComboBox()
+        self.sector_input.addItem('Any sector')
+        filters_layout.addWidget(self.sector_input)
+        self.screen_button = QPushButton('Screen')
+        self.screen_button.clicked.connect(self.run_screen)
+        filters_layout.addWidget(self.screen_button)
+
+        self.status_label = QLabel('')
+        # Results arrive ranked by SORT_BY, highest first; show that as the view's sort
+        self.rank_section = [column for _, column, _ in self.COLUMNS].index(self.SORT_BY)
+        self.results = LedgerTableView(self.universe, self.COLUMNS, sort=(self.rank_section, Qt.DescendingOrder))
+        layout = QVBoxLayout()
+        layout.addLayout(filters_layout)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.results)
+        self.setLayout(layout)
+
+        # Start from whatever market data this session already holds
+        if market_snapshot is not None:
+            self.set_universe(build_screener_universe(market_snapshot))
+
+    def load_snapshot(self):
+        options = QFileDialog.Options()
+        file_name, _ = QFileDialog.getOpenFileName(
+            self, "Load Market Snapshot", "", "Snapshots (*.json.gz *.gz);;All Files (*)", options=options
+        )
+        if file_name:
+            try:
+                self.set_universe(build_screener_universe(MarketDataSnapshot.load(file_name)))
+            except Exception as e:
+                QMessageBox.warning(
+                    self, 'Snapshot Error', f'An error occurred while loading the snapshot:\n{str(e)}'
+                )
+
+    def set_universe(self, universe):
+        self.universe = universe
+        self.sector_input.clear()
+        self.sector_input.addItems(['Any sector'] + sorted(universe['Sector'].unique()))
+        self.run_screen()
+
+    def run_screen(self):
+        try:
+            min_yield = float(self.min_yield_input.text()) if self.min_yield_input.text() else None
+            min_streak = int(self.min_streak_input.text()) if self.min_streak_input.text() else None
+        except ValueError:
+            QMessageBox.warning(self, 'Input Error', 'Please enter valid numbers for yield and growth streak.')
+            return
+        frequency = self.frequency_input.currentText()
+        sector = self.sector_input.currentText()
+        results = screen_dividend_stocks(
+            self.universe,
+            min_yield=min_yield,
+            min_streak=min_streak,
+            frequencies=[frequency] if frequency in PAYOUT_FREQUENCIES else None,
+            sectors=[sector] if sector and sector != 'Any sector' else None,
+            sort_by=self.SORT_BY
+        )
+        self.status_label.setText(f'{len(results)} of {len(self.universe)} tickers match')
+        self.results.model.set_frame(results)
+        # A header sort picked for earlier results would otherwise override the ranking
+        self.results.view.sortByColumn(self.rank_section, Qt.DescendingOrder)
+
+
 
 class DividendTracker(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle('Dividend Tracker')
         self.setGeometry(100, 100, 1200, 800)
-        self.portfolio = []
-        self.dividend_history = []
+        # Named portfolios, each with its holdings, raw imported transactions and
+        # dividend history; the properties below expose the active one
+        self.portfolios = {'Main': []}
+        self.ledgers = {'Main': pd.DataFrame()}
+        self.dividend_histories = {'Main': []}
+        self.active_portfolio = 'Main'
+        self.lot_method = 'FIFO'
+        # Row positions per ticker of the last ledger a detail window was opened for
+        self.ledger_index = None
+        # The All Accounts ledger with the portfolio ledgers it was merged from
+        self.merged_ledger = None
+        # Book, live and dividend totals per holding, sector, currency and account
+        self.rollup = RollupIndex()
+        self.report_engine = IncomeReportEngine()
         self.initUI()
         # Keep references to child windows to prevent them from being garbage collected
         self.allocation_window = None
         self.calendar_window = None
         self.report_window = None
         self.dividend_window = None
+        self.reconciliation_window = None
+        self.screener_window = None
+        self.accounts_window = None
+
+    @property
+    def portfolio(self):
+        if self.active_portfolio == CONSOLIDATED_VIEW:
+            return consolidate_portfolios(self.portfolios)
+        return self.portfolios[self.active_portfolio]
+
+    @portfolio.setter
+    def portfolio(self, holdings):
+        self.portfolios[self.active_portfolio] = holdings
+
+    @property
+    def ledger(self):
+        if self.active_portfolio == CONSOLIDATED_VIEW:
+            ledgers = list(self.ledgers.values())
+            # Imports replace a portfolio's frame, so identity shows whether the merge is current
+            if self.merged_ledger is None or len(self.merged_ledger[0]) != len(ledgers) or any(
+                cached is not ledger for cached, ledger in zip(self.merged_ledger[0], ledgers)
+            ):
+                self.merged_ledger = (ledgers, merge_transaction_frames(ledgers))
+            return self.merged_ledger[1]
+        return self.ledgers[self.active_portfolio]
+
+    @ledger.setter
+    def ledger(self, ledger):
+        self.ledgers[self.active_portfolio] = ledger
+
+    @property
+    def dividend_history(self):
+        if self.active_portfolio == CONSOLIDATED_VIEW:
+            return [item for history in self.dividend_histories.values() for item in history]
+        return self.dividend_histories[self.active_portfolio]
+
+    @dividend_history.setter
+    def dividend_history(self, history):
+        self.dividend_histories[self.active_portfolio] = history
 
     def initUI(self):
         # Central Widget
@@ -102,6 +1876,11 @@ class DividendTracker(QMainWindow):
         # Main Layout
         self.main_layout = QVBoxLayout()
 
+        # Portfolio Selector
+        self.selector_layout = QHBoxLayout()
+        self.create_portfolio_selector()
+        self.main_layout.addLayout(self.selector_layout)
+
         # Portfolio Summary Section
         self.summary_layout = QGridLayout()
         self.create_portfolio_summary()
@@ -141,7 +1920,114 @@ class DividendTracker(QMainWindow):
         import_transactions_action.triggered.connect(self.import_transactions)
         file_menu.addAction(import_transactions_action)
 
+        import_folder_action = QAction('Import Transactions Folder', self)
+        import_folder_action.triggered.connect(self.import_transactions_folder)
+        file_menu.addAction(import_folder_action)
+
+        refresh_action = QAction('Refresh Market Data', self)
+        refresh_action.triggered.connect(self.refresh_market_data)
+        file_menu.addAction(refresh_action)
+
+        # Cost basis method for lot matching
+        method_menu = menubar.addMenu('Cost Basis')
+        method_group = QActionGroup(self)
+        for method in LOT_MATCHERS:
+            method_action = QAction(method, self, checkable=True)
+            method_action.setChecked(method == self.lot_method)
+            method_action.triggered.connect(lambda checked, m=method: self.set_lot_method(m))
+            method_group.addAction(method_action)
+            method_menu.addAction(method_action)
+
+
+    def create_portfolio_selector(self):
+        self.portfolio_selector = QComboBox()
+        self.portfolio_selector.addItems(list(self.portfolios) + [CONSOLIDATED_VIEW])
+        self.portfolio_selector.currentTextChanged.connect(self.switch_portfolio)
+        self.new_portfolio_button = QPushButton('New Portfolio')
+        self.new_portfolio_button.clicked.connect(self.create_portfolio)
+        self.accounts_button = QPushButton('Accounts Overview')
+        self.accounts_button.clicked.connect(self.show_accounts_overview)
+
+        self.selector_layout.addWidget(QLabel('Portfolio:'))
+        self.selector_layout.addWidget(self.portfolio_selector)
+        self.selector_layout.addWidget(self.new_portfolio_button)
+        self.selector_layout.addWidget(self.accounts_button)
+        self.selector_layout.addStretch()
+
+    def create_portfolio(self):
+        name, ok = QInputDialog.getText(self, 'New Portfolio', 'Portfolio name:')
+        name = name.strip()
+        if not ok or not name:
+            return
+        if name in self.portfolios or name == CONSOLIDATED_VIEW:
+            QMessageBox.warning(self, 'Portfolio Error', f'A portfolio named {name} already exists.')
+            return
+        self.portfolios[name] = []
+        self.ledgers[name] = pd.DataFrame()
+        self.dividend_histories[name] = []
+        # Keep the consolidated view last
+        self.portfolio_selector.insertItem(self.portfolio_selector.count() - 1, name)
+        self.portfolio_selector.setCurrentText(name)
+
+    def switch_portfolio(self, name):
+        if not name:
+            return
+        self.active_portfolio = name
+        self.refresh_views()
+
+    def refresh_views(self):
+        self.update_table()
+        self.update_portfolio_summary()
+        self.update_portfolio_ratios()
 
+    def editable_portfolio(self, title):
+        if self.active_portfolio == CONSOLIDATED_VIEW:
+            QMessageBox.warning(self, title, 'Select a single portfolio to import into.')
+            return False
+        return True
+
+    def refresh_market_data(self):
+        symbols = {stock['symbol'] for holdings in self.portfolios.values() for stock in holdings}
+        prefetch_market_data(symbols, refresh=True)
+        self.report_engine.clear()
+        self.refresh_views()
+
+    def show_accounts_overview(self):
+        # Every portfolio is valued in parallel against one fetch of the combined symbols
+        results = value_portfolios(self.portfolios)
+        rows = []
+        for name, (_, rollup) in results.items():
+            summary = portfolio_summary(rollup)
+            rows.append({
+                'Portfolio': name,
+                'Holdings': len(self.portfolios[name]),
+                'Book Value': summary['total_value_usd'],
+                'Live Value': summary['total_live_usd'],
+                'Profit/Loss': summary['profit_loss_usd'],
+                'Dividends': summary['total_dividends_usd'],
+                'Profit/Loss + Dividends': summary['profit_loss_with_dividends_usd']
+            })
+        df = pd.DataFrame(rows)
+        totals = df.drop(columns=['Portfolio', 'Holdings']).sum()
+        df = pd.concat([df, pd.DataFrame([{
+            'Portfolio': CONSOLIDATED_VIEW, 'Holdings': len(consolidate_portfolios(self.portfolios)), **totals.to_dict()
+        }])], ignore_index=True)
+
+        self.accounts_window = QWidget()
+        self.accounts_window.setWindowTitle('Accounts Overview')
+        layout = QVBoxLayout()
+        table = LedgerTableView(df, [
+            ('Portfolio', 'Portfolio', format_text),
+            ('Holdings', 'Holdings', format_text),
+            ('Book Value ($)', 'Book Value', format_number(prefix='$')),
+            ('Live Value ($)', 'Live Value', format_number(prefix='$')),
+            ('Profit/Loss ($)', 'Profit/Loss', format_number(prefix='$')),
+            ('Dividends ($)', 'Dividends', format_number(prefix='$')),
+            ('Profit/Loss + Dividends ($)', 'Profit/Loss + Dividends', format_number(prefix='$'))
+        ])
+        layout.addWidget(table)
+        self.accounts_window.setLayout(layout)
+        self.accounts_window.show()
 
     def create_portfolio_summary(self):
         # Labels for Portfolio Summary
@@ -206,12 +2092,18 @@ class DividendTracker(QMainWindow):
         self.allocation_button.clicked.connect(self.show_portfolio_allocation)
         self.dividend_history_button = QPushButton('Show Dividend History')
         self.dividend_history_button.clicked.connect(self.show_dividend_history)
+        self.reconcile_button = QPushButton('Reconcile Dividends')
+        self.reconcile_button.clicked.connect(self.show_dividend_reconciliation)
+        self.screener_button = QPushButton('Dividend Screener')
+        self.screener_button.clicked.connect(self.show_dividend_screener)
 
         self.buttons_layout.addWidget(self.calendar_button)
         self.buttons_layout.addWidget(self.projection_button)
         self.buttons_layout.addWidget(self.report_button)
         self.buttons_layout.addWidget(self.allocation_button)
         self.buttons_layout.addWidget(self.dividend_history_button)
+        self.buttons_layout.addWidget(self.reconcile_button)
+        self.buttons_layout.addWidget(self.screener_button)
 
     def add_to_portfolio(self):
         symbol = self.symbol_input.text().upper()
@@ -254,287 +2146,104 @@ class DividendTracker(QMainWindow):
 
     def update_table(self):
         self.table.setRowCount(0)  # Clear existing data
-        total_book_value = 0
-        total_current_value = 0
-        total_dividends = 0
-        sector_allocations = {}
-
-        for stock in self.portfolio:
-            symbol = stock['symbol']
-            shares = stock['shares']
-            cost_basis = stock['cost_basis']
-            total_dividends += stock.get('total_dividends', 0.0)
-
-            # Fetch current price and dividend data
-            current_price = get_current_price(symbol)
-            overview = get_stock_overview(symbol)
-            if current_price is None:
-                continue
-
-            market_value = current_price * shares
-            book_value = cost_basis * shares
-            unrealized_gain = market_value - book_value
-            unrealized_gain_percent = (unrealized_gain / book_value) * 100 if book_value > 0 else 0
-            total_return = (unrealized_gain + stock.get('total_dividends', 0.0)) / book_value * 100 if book_value > 0 else 0
-
-            dividend_per_share = float(overview.get('dividendRate', 0.0)) if overview.get('dividendRate') else 0.0
-            annual_dividend = dividend_per_share * shares
-            dividend_yield = (dividend_per_share / current_price) * 100 if current_price > 0 else 0.0
-
-            # Current Yield on Cost
-            current_yoc = (dividend_per_share / cost_basis) * 100 if cost_basis > 0 else 0.0
-
-            # Calculate Actual Dividend Growth
-            dividends_df = get_dividend_events(symbol)
-            if not dividends_df.empty:
-                dividends_df['Date'] = pd.to_datetime(dividends_df['Date'])
-                dividends_df['Year'] = dividends_df['Date'].dt.year
-                dividends_per_year = dividends_df.groupby('Year')['Dividend'].sum().sort_index()
-                if len(dividends_per_year) >= 2:
-                    last_year = dividends_per_year.index[-1]
-                    prev_year = dividends_per_year.index[-2]
-                    last_year_div = dividends_per_year[last_year]
-                    prev_year_div = dividends_per_year[prev_year]
-                    if prev_year_div != 0:
-                        actual_dividend_growth = ((last_year_div - prev_year_div) / prev_year_div) * 100
-                    else:
-                        actual_dividend_growth = None
-                else:
-                    actual_dividend_growth = None
-            else:
-                actual_dividend_growth = None
-
-            if actual_dividend_growth is not None:
-                actual_dividend_growth_str = f"{actual_dividend_growth:.2f}%"
+        valuations, _ = value_portfolio(self.portfolio, self.rollup)
+        # The rollup keeps every account's row; the table shows one row per symbol
+        valuations = merge_valuations(valuations)
+
+        for valuation in valuations:
+            symbol = valuation['symbol']
+            if valuation['actual_dividend_growth'] is not None:
+                actual_dividend_growth_str = f"{valuation['actual_dividend_growth']:.2f}%"
             else:
                 actual_dividend_growth_str = 'N/A'
 
-            # Currency conversions (Assuming 1 USD = 0.9 EUR for example)
-            exchange_rate = 0.9  # Replace with actual rate or fetch dynamically
-            eur_cash_invested = book_value * exchange_rate
-            current_eur_value = market_value * exchange_rate
-            eur_unrealized_gain = current_eur_value - eur_cash_invested
-            eur_unrealized_gain_percent = (eur_unrealized_gain / eur_cash_invested) * 100 if eur_cash_invested > 0 else 0
-            eur_total_return = (eur_unrealized_gain + stock.get('total_dividends', 0.0) * exchange_rate) / eur_cash_invested * 100 if eur_cash_invested > 0 else 0
-
-            total_book_value += book_value
-            total_current_value += market_value
-
-            # Sector allocations
-            sector = stock.get('sector', 'Unknown')
-            sector_allocations.setdefault(sector, {'book_value': 0, 'current_value': 0})
-            sector_allocations[sector]['book_value'] += book_value
-            sector_allocations[sector]['current_value'] += market_value
-
             row_position = self.table.rowCount()
             self.table.insertRow(row_position)
             # Fill table with data
             data = [
-                sector,
-                stock.get('company_name', ''),
+                valuation['sector'],
+                valuation['company_name'],
                 symbol,
-                f"{shares:.4f}",
-                f"${cost_basis:.2f}",
-                f"${current_price:.2f}",
-                f"${book_value:.2f}",
-                f"${market_value:.2f}",
-                f"${unrealized_gain:.2f}",
-                f"{unrealized_gain_percent:.2f}%",
-                f"${unrealized_gain + stock.get('total_dividends', 0.0):.2f}",
-                f"{total_return:.2f}%",
-                f"${stock.get('total_dividends', 0.0):.2f}",
-                f"€{eur_cash_invested:.2f}",
-                f"€{current_eur_value:.2f}",
-                f"€{eur_unrealized_gain:.2f}",
-                f"{eur_unrealized_gain_percent:.2f}%",
-                f"€{eur_unrealized_gain + stock.get('total_dividends', 0.0) * exchange_rate:.2f}",
-                f"{eur_total_return:.2f}%",
-                f"€{stock.get('total_dividends', 0.0) * exchange_rate:.2f}",
-                f"{dividend_yield:.2f}%",
-                f"{current_yoc:.2f}%",
+                f"{valuation['shares']:.4f}",
+                f"${valuation['cost_basis']:.2f}",
+                f"${valuation['current_price']:.2f}",
+                f"${valuation['book_value']:.2f}",
+                f"${valuation['market_value']:.2f}",
+                f"${valuation['unrealized_gain']:.2f}",
+                f"{valuation['unrealized_gain_percent']:.2f}%",
+                f"${valuation['unrealized_gain'] + valuation['total_dividends']:.2f}",
+                f"{valuation['total_return']:.2f}%",
+                f"${valuation['total_dividends']:.2f}",
+                f"€{valuation['eur_cash_invested']:.2f}",
+                f"€{valuation['current_eur_value']:.2f}",
+                f"€{valuation['eur_unrealized_gain']:.2f}",
+                f"{valuation['eur_unrealized_gain_percent']:.2f}%",
+                f"€{valuation['eur_unrealized_gain'] + valuation['eur_total_dividends']:.2f}",
+                f"{valuation['eur_total_return']:.2f}%",
+                f"€{valuation['eur_total_dividends']:.2f}",
+                f"{valuation['dividend_yield']:.2f}%",
+                f"{valuation['current_yoc']:.2f}%",
                 actual_dividend_growth_str,
-                '',  # Portfolio Alloc % Book Value (to be calculated)
-                '',  # Portfolio Alloc % Live Value (to be calculated)
-                '',  # Sector Alloc % Book Value (to be calculated)
-                '',  # Sector Alloc % Live Value (to be calculated)
-                '',  # % Dividends in Portfolio
+                f"{valuation['portfolio_alloc_book']:.2f}%",
+                f"{valuation['portfolio_alloc_live']:.2f}%",
+                f"{valuation['sector_alloc_book']:.2f}%",
+                f"{valuation['sector_alloc_live']:.2f}%",
+                f"{valuation['dividends_in_portfolio']:.2f}%",
             ]
             for col, value in enumerate(data):
                 self.table.setItem(row_position, col, QTableWidgetItem(value))
 
-        # Calculate allocations
-        for row in range(self.table.rowCount()):
-            book_value = float(self.table.item(row, 6).text().replace('$', ''))
-            market_value = float(self.table.item(row, 7).text().replace('$', ''))
-            symbol = self.table.item(row, 2).text()
-            sector = self.table.item(row, 0).text()
-
-            # Portfolio Allocation %
-            portfolio_alloc_book = (book_value / total_book_value * 100) if total_book_value > 0 else 0
-            portfolio_alloc_live = (market_value / total_current_value * 100) if total_current_value > 0 else 0
-            self.table.setItem(row, 23, QTableWidgetItem(f"{portfolio_alloc_book:.2f}%"))
-            self.table.setItem(row, 24, QTableWidgetItem(f"{portfolio_alloc_live:.2f}%"))
-
-            # Sector Allocation %
-            sector_book_value = sector_allocations[sector]['book_value']
-            sector_current_value = sector_allocations[sector]['current_value']
-            sector_alloc_book = (book_value / sector_book_value * 100) if sector_book_value > 0 else 0
-            sector_alloc_live = (market_value / sector_current_value * 100) if sector_current_value > 0 else 0
-            self.table.setItem(row, 25, QTableWidgetItem(f"{sector_alloc_book:.2f}%"))
-            self.table.setItem(row, 26, QTableWidgetItem(f"{sector_alloc_live:.2f}%"))
-
-            # % Dividends in Portfolio
-            total_dividends_row = float(self.table.item(row, 12).text().replace('$', ''))
-            dividends_in_portfolio = (total_dividends_row / total_dividends) * 100 if total_dividends > 0 else 0
-            self.table.setItem(row, 27, QTableWidgetItem(f"{dividends_in_portfolio:.2f}%"))
-
     def update_portfolio_summary(self):
-        # Calculate summary values
-        total_value_usd = sum(stock['cost_basis'] * stock['shares'] for stock in self.portfolio)
-        total_live_usd = sum(get_current_price(stock['symbol']) * stock['shares'] for stock in self.portfolio if get_current_price(stock['symbol']) is not None)
-        profit_loss_usd = total_live_usd - total_value_usd
-        total_dividends_usd = sum(stock.get('total_dividends', 0.0) for stock in self.portfolio)
-        profit_loss_with_dividends_usd = profit_loss_usd + total_dividends_usd
-
-        # Currency conversion
-        exchange_rate = 0.9  # Replace with actual rate or fetch dynamically
-        total_value_eur = total_value_usd * exchange_rate
-        total_live_eur = total_live_usd * exchange_rate
-        profit_loss_eur = total_live_eur - total_value_eur
-        total_dividends_eur = total_dividends_usd * exchange_rate
-        profit_loss_with_dividends_eur = profit_loss_eur + total_dividends_eur
-
-        # Dividend % in Portfolio
-        dividend_percent_portfolio = (total_dividends_usd / total_value_usd * 100) if total_value_usd > 0 else 0
+        # Summary values come from the rollup filled by update_table
+        summary = portfolio_summary(self.rollup)
 
         # Update labels
-        self.summary_values['Total Value ($):'].setText(f"${total_value_usd:.2f}")
-        self.summary_values['Total Live ($):'].setText(f"${total_live_usd:.2f}")
-        self.summary_values['Profit/Loss ($):'].setText(f"${profit_loss_usd:.2f}")
-        self.summary_values['Profit/Loss + Dividends ($):'].setText(f"${profit_loss_with_dividends_usd:.2f}")
-        self.summary_values['Total Dividends ($):'].setText(f"${total_dividends_usd:.2f}")
-        self.summary_values['Total Value (€):'].setText(f"€{total_value_eur:.2f}")
-        self.summary_values['Total Live (€):'].setText(f"€{total_live_eur:.2f}")
-        self.summary_values['Profit/Loss (€):'].setText(f"€{profit_loss_eur:.2f}")
-        self.summary_values['Profit/Loss + Dividends (€):'].setText(f"€{profit_loss_with_dividends_eur:.2f}")
-        self.summary_values['Total Dividends (€):'].setText(f"€{total_dividends_eur:.2f}")
-        self.summary_values['Dividend % in Portfolio:'].setText(f"{dividend_percent_portfolio:.2f}%")
+        self.summary_values['Total Value ($):'].setText(f"${summary['total_value_usd']:.2f}")
+        self.summary_values['Total Live ($):'].setText(f"${summary['total_live_usd']:.2f}")
+        self.summary_values['Profit/Loss ($):'].setText(f"${summary['profit_loss_usd']:.2f}")
+        self.summary_values['Profit/Loss + Dividends ($):'].setText(f"${summary['profit_loss_with_dividends_usd']:.2f}")
+        self.summary_values['Total Dividends ($):'].setText(f"${summary['total_dividends_usd']:.2f}")
+        self.summary_values['Total Value (€):'].setText(f"€{summary['total_value_eur']:.2f}")
+        self.summary_values['Total Live (€):'].setText(f"€{summary['total_live_eur']:.2f}")
+        self.summary_values['Profit/Loss (€):'].setText(f"€{summary['profit_loss_eur']:.2f}")
+        self.summary_values['Profit/Loss + Dividends (€):'].setText(f"€{summary['profit_loss_with_dividends_eur']:.2f}")
+        self.summary_values['Total Dividends (€):'].setText(f"€{summary['total_dividends_eur']:.2f}")
+        self.summary_values['Dividend % in Portfolio:'].setText(f"{summary['dividend_percent_portfolio']:.2f}%")
 
     def update_portfolio_ratios(self):
-        # Placeholder calculations (implement actual calculations based on your data)
-        dividend_roi = 0.0
-        yearly_dividend_yield = 0.0
-        portfolio_growth = 0.0
-        monthly_dividend_growth = 0.0
-        yoy_monthly_dividend_growth = 0.0
+        ratios = portfolio_ratios(self.portfolio)
 
         # Update labels
-        self.ratio_values['Dividend ROI %:'].setText(f"{dividend_roi:.2f}%")
-        self.ratio_values['Yearly Portfolio Dividend Yield:'].setText(f"{yearly_dividend_yield:.2f}%")
-        self.ratio_values['Portfolio Growth %:'].setText(f"{portfolio_growth:.2f}%")
-        self.ratio_values['Monthly Dividend Growth %:'].setText(f"{monthly_dividend_growth:.2f}%")
-        self.ratio_values['Year-on-Year Monthly Dividend Growth %:'].setText(f"{yoy_monthly_dividend_growth:.2f}%")
+        self.ratio_values['Dividend ROI %:'].setText(f"{ratios['dividend_roi']:.2f}%")
+        self.ratio_values['Yearly Portfolio Dividend Yield:'].setText(f"{ratios['yearly_dividend_yield']:.2f}%")
+        self.ratio_values['Portfolio Growth %:'].setText(f"{ratios['portfolio_growth']:.2f}%")
+        self.ratio_values['Monthly Dividend Growth %:'].setText(f"{ratios['monthly_dividend_growth']:.2f}%")
+        self.ratio_values['Year-on-Year Monthly Dividend Growth %:'].setText(f"{ratios['yoy_monthly_dividend_growth']:.2f}%")
+
+    def set_lot_method(self, method):
+        self.lot_method = method
+        for name, ledger in self.ledgers.items():
+            if not ledger.empty:
+                self.portfolios[name], self.dividend_histories[name] = holdings_from_ledger(
+                    ledger, method, self.portfolios[name]
+                )
+        self.refresh_views()
 
     def process_transactions(self, df):
-        # Process 'Market buy' transactions
-        market_buys = df[df['Action'] == 'Market buy']
-        for index, row in market_buys.iterrows():
-            symbol = row['Ticker']
-            shares = float(row['No. of shares'])
-            total_cost = float(row['Total']) if pd.notnull(row['Total']) else 0.0
-            currency_conversion_fee = float(row['Currency conversion fee']) if pd.notnull(row['Currency conversion fee']) else 0.0
-            # Add currency conversion fee to total cost
-            total_cost += currency_conversion_fee
-
-            # Calculate cost basis per share
-            cost_basis_per_share = total_cost / shares if shares != 0 else 0
+        # Merge into the ledger so re-importing an overlapping export is harmless
+        self.ledger = merge_transaction_frames([self.ledger, df])
+        if not self.ledger.empty:
+            self.rebuild_holdings()
 
-            # Fetch company name and sector
-            overview = get_stock_overview(symbol)
-            company_name = overview.get('longName', '')
-            sector = overview.get('sector', '')
-
-            # Get exchange rate
-            exchange_rate_str = row.get('Exchange rate', '')
-            try:
-                exchange_rate = float(exchange_rate_str)
-            except (ValueError, TypeError):
-                exchange_rate = 1.0  # Default exchange rate
-
-            # Create a transaction record
-            transaction = {
-                'Purchase Date': pd.to_datetime(row['Time']).date(),
-                'Order ID': row.get('ID', ''),
-                'ISIN': row.get('ISIN', ''),
-                'Purchase Price $': float(row['Price / share']) if pd.notnull(row['Price / share']) else 0.0,
-                'Purchase Price €': total_cost,  # Assuming total_cost is in EUR
-                'Qty. Shares': shares,
-                'Value EUR': total_cost,
-                'Currency exchange': exchange_rate,
-                'Broker FX Fee EUR': currency_conversion_fee,
-                'Consideration $': total_cost / exchange_rate if exchange_rate else total_cost
-            }
-
-            # Update portfolio
-            found = False
-            for stock in self.portfolio:
-                if stock['symbol'] == symbol:
-                    # Update shares and cost basis
-                    total_shares = stock['shares'] + shares
-                    # Calculate new average cost basis
-                    total_cost_basis = (stock['shares'] * stock['cost_basis']) + total_cost
-                    new_cost_basis_per_share = total_cost_basis / total_shares
-                    stock['shares'] = total_shares
-                    stock['cost_basis'] = new_cost_basis_per_share
-                    # Append transaction
-                    stock.setdefault('transactions', []).append(transaction)
-                    found = True
-                    break
-            if not found:
-                # Add new holding
-                self.portfolio.append({
-                    'symbol': symbol,
-                    'company_name': company_name,
-                    'sector': sector,
-                    'shares': shares,
-                    'cost_basis': cost_basis_per_share,
-                    'total_dividends': 0.0,
-                    'transactions': [transaction],
-                    'dividends': []
-                })
-
-        # Process 'Dividend' transactions
-        dividends = df[df['Action'].str.contains('Dividend', na=False)]
-        for index, row in dividends.iterrows():
-            symbol = row['Ticker']
-            date = pd.to_datetime(row['Time']).date()
-            amount = float(row['Total']) if pd.notnull(row['Total']) else 0.0
-
-            # Create dividend record
-            dividend_record = {
-                'Date': date,
-                'Dividend Received $': amount,
-                'Dividend Received EUR': amount * 0.9,  # Assuming exchange rate
-                'Comments': row.get('Notes', '')  # Adjusted from 'Comments' to 'Notes'
-            }
-
-            # Update total dividends in portfolio
-            for stock in self.portfolio:
-                if stock['symbol'] == symbol:
-                    stock['total_dividends'] = stock.get('total_dividends', 0.0) + amount
-                    # Append dividend record
-                    stock.setdefault('dividends', []).append(dividend_record)
-                    break
-            else:
-                # If the stock is not in the portfolio, you might want to add it or skip
-                pass
+    def rebuild_holdings(self):
+        self.portfolio, self.dividend_history = holdings_from_ledger(self.ledger, self.lot_method, self.portfolio)
 
         # Update the table and summaries
-        self.update_table()
-        self.update_portfolio_summary()
-        self.update_portfolio_ratios()
+        self.refresh_views()
 
     def import_portfolio(self):
+        if not self.editable_portfolio('Import Error'):
+            return
         options = QFileDialog.Options()
         file_name, _ = QFileDialog.getOpenFileName(
             self, "Import Portfolio", "", "CSV Files (*.csv);;All Files (*)", options=options
@@ -560,6 +2269,8 @@ class DividendTracker(QMainWindow):
                 )
 
     def import_transactions(self):
+        if not self.editable_portfolio('Import Error'):
+            return
         options = QFileDialog.Options()
         file_name, _ = QFileDialog.getOpenFileName(
             self, "Import Transactions", "", "CSV Files (*.csv);;All Files (*)", options=options
@@ -577,47 +2288,41 @@ class DividendTracker(QMainWindow):
                     self, 'Import Error', f'An error occurred while importing the transactions:\n{str(e)}'
                 )
 
-    def show_dividend_calendar(self):
-        # Collect all dividend events
-        all_dividends = []
-
-        # Include imported dividend transactions
-        if self.dividend_history:
-            df_dividends = pd.DataFrame(self.dividend_history)
-            df_dividends['Date'] = pd.to_datetime(df_dividends['Date'])
-            all_dividends.append(df_dividends)
-
-        for stock in self.portfolio:
-            symbol = stock['symbol']
-            shares = stock['shares']
-
-            dividends = get_dividend_events(symbol)
-            if not dividends.empty:
-                dividends['Symbol'] = symbol
-                dividends['Dividend'] = dividends['Dividend'] * shares
-                all_dividends.append(dividends)
+    def import_transactions_folder(self):
+        if not self.editable_portfolio('Import Error'):
+            return
+        directory = QFileDialog.getExistingDirectory(self, "Import Transactions Folder")
+        if directory:
+            try:
+                df = load_transaction_files(directory)
+                if df.empty:
+                    QMessageBox.warning(self, 'Import Error', 'No CSV files found in the selected folder.')
+                    return
+                # Cost basis is processed once for all files
+                self.process_transactions(df)
+                QMessageBox.information(
+                    self, 'Import Successful', f'{len(df)} transactions imported successfully.'
+                )
+            except Exception as e:
+                QMessageBox.warning(
+                    self, 'Import Error', f'An error occurred while importing the transactions:\n{str(e)}'
+                )
 
-        if not all_dividends:
+    def show_dividend_calendar(self):
+        df = dividend_calendar(self.portfolio, self.dividend_history)
+        if df.empty:
             QMessageBox.information(self, 'Dividend Calendar', 'No dividend data available.')
             return
 
-        df = pd.concat(all_dividends)
-        df.sort_values('Date', inplace=True)
-        df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')
-
         # Show in a new window with a table
         self.calendar_window = QWidget()
         self.calendar_window.setWindowTitle('Dividend Calendar')
         layout = QVBoxLayout()
-        table = QTableWidget()
-        table.setRowCount(len(df))
-        table.setColumnCount(3)
-        table.setHorizontalHeaderLabels(['Date', 'Symbol', 'Dividend Amount'])
-        for i, row in df.iterrows():
-            table.setItem(i, 0, QTableWidgetItem(row['Date']))
-            table.setItem(i, 1, QTableWidgetItem(row['Symbol']))
-            table.setItem(i, 2, QTableWidgetItem(f"${row['Dividend']:.2f}"))
-        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table = LedgerTableView(df, [
+            ('Date', 'Date', format_date),
+            ('Symbol', 'Symbol', format_text),
+            ('Dividend Amount', 'Dividend', format_number(prefix='$'))
+        ])
         layout.addWidget(table)
         self.calendar_window.setLayout(layout)
         self.calendar_window.show()
@@ -654,50 +2359,42 @@ class DividendTracker(QMainWindow):
         QMessageBox.information(self, 'Income Projections', message)
 
     def generate_income_report(self):
-        total_annual_dividend = 0
-        projections = []
-
-        for stock in self.portfolio:
-            symbol = stock['symbol']
-            shares = stock['shares']
-
-            # Fetch dividend per share
-            overview = get_stock_overview(symbol)
-            dividend_per_share = float(overview.get('dividendRate', 0.0)) if overview.get('dividendRate') else 0.0
-
-            annual_dividend = dividend_per_share * shares
-            total_annual_dividend += annual_dividend
-
-            projections.append({
-                'Symbol': symbol,
-                'Shares': shares,
-                'Dividend Per Share': dividend_per_share,
-                'Annual Dividend': annual_dividend
-            })
-
-        # Include imported dividend transactions
-        if self.dividend_history:
-            df_dividends = pd.DataFrame(self.dividend_history)
-            total_imported_dividends = df_dividends['Dividend'].sum()
-            total_annual_dividend += total_imported_dividends
-            projections.append({
-                'Symbol': 'Imported Dividends',
-                'Shares': '',
-                'Dividend Per Share': '',
-                'Annual Dividend': total_imported_dividends
-            })
-
-        # Convert to DataFrame
-        df = pd.DataFrame(projections)
+        tables = self.report_engine.build(self.ledger, self.portfolio)
 
         # Ask user to select a file to save the report
+        # Only offer formats whose writer library is installed
+        filters = ['CSV Files (*.csv)'] + [
+            name for extension, (name, _) in REPORT_WRITERS.items() if report_writer_available(extension)
+        ] + ['All Files (*)']
         options = QFileDialog.Options()
         file_name, _ = QFileDialog.getSaveFileName(
-            self, "Save Income Report", "", "CSV Files (*.csv);;All Files (*)", options=options
+            self, "Save Income Report", "", ';;'.join(filters), options=options
         )
         if file_name:
+            extension = os.path.splitext(file_name)[1].lower()
+            if not report_writer_available(extension):
+                QMessageBox.warning(
+                    self, 'Report Error',
+                    f'Saving {extension} reports needs the optional {REPORT_WRITERS[extension][1]} package.'
+                )
+                return
             try:
-                df.to_csv(file_name, index=False)
+                if extension == '.xlsx':
+                    write_report_xlsx(tables, file_name)
+                elif extension == '.parquet':
+                    file_name = ', '.join(write_report_parquet(tables, file_name))
+                else:
+                    # Flat per-symbol projection, as before
+                    df = tables['forward_12m']
+                    if self.dividend_history:
+                        total_imported_dividends = pd.DataFrame(self.dividend_history)['Dividend'].sum()
+                        df = pd.concat([df, pd.DataFrame([{
+                            'Symbol': 'Imported Dividends',
+                            'Shares': '',
+                            'Dividend Per Share': '',
+                            'Annual Dividend': total_imported_dividends
+                        }])], ignore_index=True)
+                    df.to_csv(file_name, index=False)
                 QMessageBox.information(
                     self, 'Report Generated', f'Income report saved to {file_name}'
                 )
@@ -708,44 +2405,38 @@ class DividendTracker(QMainWindow):
         else:
             QMessageBox.information(self, 'Report Cancelled', 'Income report generation cancelled.')
 
-    def show_portfolio_allocation(self):
-        # Calculate total market value and allocation
-        allocation = {}
-        total_value = 0
-        for stock in self.portfolio:
-            symbol = stock['symbol']
-            shares = stock['shares']
-            current_price = get_current_price(symbol)
-            if current_price is not None:
-                market_value = current_price * shares
-                allocation[symbol] = market_value
-                total_value += market_value
-            else:
-                allocation[symbol] = 0
+    def chart_aggregates(self):
+        # Market value per holding and sector from the rollup, received dividends per month
+        holdings = {}
+        for (_, symbol), (_, values) in self.rollup.holdings.items():
+            holdings[symbol] = holdings.get(symbol, 0.0) + values['current_value']
+        sectors = {sector: totals['current_value'] for sector, totals in self.rollup.group_totals('sector').items()}
+
+        if self.dividend_history:
+            df_dividends = pd.DataFrame(self.dividend_history)
+            months = pd.to_datetime(df_dividends['Date']).dt.strftime('%Y-%m')
+            monthly_income = df_dividends.groupby(months)['Dividend'].sum().sort_index()
+        else:
+            monthly_income = pd.Series(dtype=float)
+
+        return {
+            'holdings': pd.Series(holdings, dtype=float),
+            'sectors': pd.Series(sectors, dtype=float),
+            'monthly_income': monthly_income
+        }
 
-        if total_value == 0:
+    def show_portfolio_allocation(self):
+        aggregates = self.chart_aggregates()
+        if aggregates['holdings'].sum() == 0:
             QMessageBox.warning(self, 'Allocation Error', 'Total market value is zero.')
             return
 
-        # Prepare data for pie chart
-        labels = list(allocation.keys())
-        sizes = [value / total_value * 100 for value in allocation.values()]
-
-        # Plot pie chart
-        fig, ax = plt.subplots()
-        ax.pie(sizes, labels=labels, autopct='%1.1f%%')
-        ax.axis('equal')
-        ax.set_title('Portfolio Allocation')
-
-        # Show in a new window
-        canvas = FigureCanvasQTAgg(fig)
-        self.allocation_window = QWidget()
-        allocation_layout = QVBoxLayout()
-        allocation_layout.addWidget(canvas)
-        self.allocation_window.setLayout(allocation_layout)
-        self.allocation_window.setWindowTitle('Portfolio Allocation')
+        # Reuse the same window and figures across clicks
+        if self.allocation_window is None:
+            self.allocation_window = ChartsWindow()
+        self.allocation_window.update_charts(aggregates)
         self.allocation_window.show()
-        canvas.draw()
+        self.allocation_window.raise_()
 
     def export_portfolio(self):
         options = QFileDialog.Options()
@@ -771,39 +2462,99 @@ class DividendTracker(QMainWindow):
 
         df = pd.DataFrame(self.dividend_history)
         df.sort_values('Date', inplace=True)
-        df['Date'] = df['Date'].astype(str)
 
         # Show in a new window with a table
         self.dividend_window = QWidget()
         self.dividend_window.setWindowTitle('Dividend History')
         layout = QVBoxLayout()
-        table = QTableWidget()
-        table.setRowCount(len(df))
-        table.setColumnCount(3)
-        table.setHorizontalHeaderLabels(['Date', 'Symbol', 'Dividend Amount'])
-        for i, row in df.iterrows():
-            table.setItem(i, 0, QTableWidgetItem(row['Date']))
-            table.setItem(i, 1, QTableWidgetItem(row['Symbol']))
-            table.setItem(i, 2, QTableWidgetItem(f"${row['Dividend']:.2f}"))
-        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table = LedgerTableView(df, [
+            ('Date', 'Date', format_date),
+            ('Symbol', 'Symbol', format_text),
+            ('Dividend Amount', 'Dividend', format_number(prefix='$'))
+        ])
         layout.addWidget(table)
         self.dividend_window.setLayout(layout)
         self.dividend_window.show()
 
+    def show_dividend_reconciliation(self):
+        if self.ledger.empty:
+            QMessageBox.information(self, 'Dividend Reconciliation', 'Import transactions first.')
+            return
+
+        try:
+            report = reconcile_dividends(self.ledger)
+        except Exception as e:
+            QMessageBox.warning(
+                self, 'Reconciliation Error', f'An error occurred while reconciling dividends:\n{str(e)}'
+            )
+            return
+        if report.empty:
+            QMessageBox.information(self, 'Dividend Reconciliation', 'No dividends to reconcile.')
+            return
+        mismatches = (~report['Status'].isin(['OK', 'Pending'])).sum()
+
+        # Show in a new window with a table
+        self.reconciliation_window = QWidget()
+        self.reconciliation_window.setWindowTitle(f'Dividend Reconciliation ({mismatches} flagged)')
+        layout = QVBoxLayout()
+        columns = []
+        for column in report.columns:
+            if column in ('Ex-Date', 'Paid Date'):
+                columns.append((column, column, format_date))
+            elif column in ('Symbol', 'Status'):
+                columns.append((column, column, format_text))
+            else:
+                columns.append((column, column, format_number(decimals=4)))
+        table = LedgerTableView(report, columns)
+        layout.addWidget(table)
+        self.reconciliation_window.setLayout(layout)
+        self.reconciliation_window.show()
+
+    def show_dividend_screener(self):
+        if self.screener_window is None:
+            self.screener_window = ScreenerWindow()
+        self.screener_window.show()
+        self.screener_window.raise_()
+
     def open_stock_details(self, item):
         row = item.row()
         symbol = self.table.item(row, 2).text()  # Assuming the 'Ticker' column is at index 2
         # Find the stock data
-        stock_data = next((stock for stock in self.portfolio if stock['symbol'] == symbol), None)
+        stock_data = next((stock for stock in merge_holdings(self.portfolio) if stock['symbol'] == symbol), None)
         if stock_data:
-            self.stock_detail_window = StockDetailWindow(stock_data)
+            self.stock_detail_window = StockDetailWindow(stock_data, self.symbol_ledger(symbol))
             self.stock_detail_window.show()
 
+    def symbol_ledger(self, symbol):
+        # Ticker positions are indexed once per ledger, so each window only touches its own rows
+        ledger = self.ledger
+        if self.ledger_index is None or self.ledger_index[0] is not ledger:
+            positions = ledger.groupby('Ticker').indices if 'Ticker' in ledger.columns else {}
+            self.ledger_index = (ledger, positions)
+        rows = self.ledger_index[1].get(symbol)
+        return ledger.iloc[rows] if rows is not None else ledger.iloc[:0]
+
 class StockDetailWindow(QWidget):
-    def __init__(self, stock_data):
+    TRANSACTION_COLUMNS = [
+        'Purchase Date', 'Order ID', 'ISIN', 'Purchase Price $', 'Purchase Price €',
+        'Qty. Shares', 'Value EUR', 'Broker FX Fee EUR', 'Consideration $'
+    ]
+    DIVIDEND_COLUMNS = ['Date', 'Dividend Received $', 'Dividend Received EUR', 'Comments']
+
+    def __init__(self, stock_data, ledger=None):
+        # ledger: this symbol's rows of the imported transactions, if any
         super().__init__()
         self.setWindowTitle(f"Details for {stock_data['symbol']}")
         self.stock_data = stock_data
+        self.current_price = get_current_price(stock_data['symbol'])
+        if ledger is not None and not ledger.empty:
+            self.transactions = ledger_purchases(ledger)[self.TRANSACTION_COLUMNS]
+            self.dividends = ledger_dividends(ledger)[self.DIVIDEND_COLUMNS]
+        else:
+            # Holdings entered by hand or loaded from a portfolio CSV have no transactions
+            self.transactions = pd.DataFrame(columns=self.TRANSACTION_COLUMNS, dtype=float)
+            self.dividends = pd.DataFrame(columns=self.DIVIDEND_COLUMNS)
+        self.lots = self.open_lots()
         self.initUI()
 
     def initUI(self):
@@ -822,58 +2573,59 @@ class StockDetailWindow(QWidget):
         # Transactions Table
         transactions_label = QLabel("Transactions:")
         layout.addWidget(transactions_label)
-        transactions_table = QTableWidget()
-        transactions_table.setColumnCount(8)
-        transactions_table.setHorizontalHeaderLabels([
-            'Purchase Date', 'Order ID', 'ISIN', 'Purchase Price $',
-            'Purchase Price €', 'Qty. Shares', 'Value EUR', 'Broker FX Fee EUR'
+        transactions_table = LedgerTableView(self.transactions, [
+            ('Purchase Date', 'Purchase Date', format_date),
+            ('Order ID', 'Order ID', format_text),
+            ('ISIN', 'ISIN', format_text),
+            ('Purchase Price $', 'Purchase Price $', format_number(prefix='$')),
+            ('Purchase Price €', 'Purchase Price €', format_number(prefix='€')),
+            ('Qty. Shares', 'Qty. Shares', format_text),
+            ('Value EUR', 'Value EUR', format_number(prefix='€')),
+            ('Broker FX Fee EUR', 'Broker FX Fee EUR', format_number(prefix='€'))
         ])
-        transactions = self.stock_data.get('transactions', [])
-        transactions_table.setRowCount(len(transactions))
-        for i, txn in enumerate(transactions):
-            transactions_table.setItem(i, 0, QTableWidgetItem(str(txn['Purchase Date'])))
-            transactions_table.setItem(i, 1, QTableWidgetItem(txn['Order ID']))
-            transactions_table.setItem(i, 2, QTableWidgetItem(txn['ISIN']))
-            transactions_table.setItem(i, 3, QTableWidgetItem(f"${txn['Purchase Price $']:.2f}"))
-            transactions_table.setItem(i, 4, QTableWidgetItem(f"€{txn['Purchase Price €']:.2f}"))
-            transactions_table.setItem(i, 5, QTableWidgetItem(f"{txn['Qty. Shares']}"))
-            transactions_table.setItem(i, 6, QTableWidgetItem(f"€{txn['Value EUR']:.2f}"))
-            transactions_table.setItem(i, 7, QTableWidgetItem(f"€{txn['Broker FX Fee EUR']:.2f}"))
-        transactions_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         layout.addWidget(transactions_table)
 
         # Dividends Table
         dividends_label = QLabel("Dividends:")
         layout.addWidget(dividends_label)
-        dividends_table = QTableWidget()
-        dividends_table.setColumnCount(4)
-        dividends_table.setHorizontalHeaderLabels([
-            'Date', 'Dividend Received $', 'Dividend Received EUR', 'Comments'
+        dividends_table = LedgerTableView(self.dividends, [
+            ('Date', 'Date', format_date),
+            ('Dividend Received $', 'Dividend Received $', format_number(prefix='$')),
+            ('Dividend Received EUR', 'Dividend Received EUR', format_number(prefix='€')),
+            ('Comments', 'Comments', format_text)
         ])
-        dividends = self.stock_data.get('dividends', [])
-        dividends_table.setRowCount(len(dividends))
-        for i, div in enumerate(dividends):
-            dividends_table.setItem(i, 0, QTableWidgetItem(str(div['Date'])))
-            dividends_table.setItem(i, 1, QTableWidgetItem(f"${div['Dividend Received $']:.2f}"))
-            dividends_table.setItem(i, 2, QTableWidgetItem(f"€{div['Dividend Received EUR']:.2f}"))
-            comments = div.get('Comments', '')
-            if pd.isna(comments):
-                comments = ''
-            dividends_table.setItem(i, 3, QTableWidgetItem(comments))
-        dividends_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         layout.addWidget(dividends_table)
 
+        # Open Lots Table
+        lots_label = QLabel("Open Lots:")
+        layout.addWidget(lots_label)
+        lots = self.lots.assign(**{'Cost / Share': self.lots['Cost'] / self.lots['Shares']})
+        lots_table = LedgerTableView(lots, [
+            ('Open Date', 'Open Date', format_date),
+            ('Order ID', 'Order ID', format_text),
+            ('Shares', 'Shares', format_number(decimals=4)),
+            ('Cost', 'Cost', format_number(prefix='€')),
+            ('Cost / Share', 'Cost / Share', format_number(prefix='€')),
+            ('Unrealized P&L', 'Unrealized P&L', format_number())
+        ])
+        layout.addWidget(lots_table)
+
         self.setLayout(layout)
 
+    def open_lots(self):
+        lots = pd.DataFrame(self.stock_data.get('lots', []), columns=['Open Date', 'Order ID', 'Shares', 'Cost'])
+        lots['Symbol'] = self.stock_data['symbol']
+        return unrealized_lot_pl(lots, {self.stock_data['symbol']: self.current_price})
+
     def calculate_metrics(self):
         # Perform calculations similar to the data you provided
 
         average_purchase_price = self.stock_data['cost_basis']
         total_shares = self.stock_data['shares']
-        current_price = get_current_price(self.stock_data['symbol'])
+        current_price = self.current_price
 
         # USD Calculations
-        total_value_usd = sum(txn['Consideration $'] for txn in self.stock_data.get('transactions', []))
+        total_value_usd = self.transactions['Consideration $'].sum()
         current_value_usd = current_price * total_shares
         profit_loss_usd = current_value_usd - total_value_usd
         profit_loss_percent_usd = (profit_loss_usd / total_value_usd) * 100 if total_value_usd else 0
@@ -909,15 +2661,70 @@ class StockDetailWindow(QWidget):
             'Profit/Loss (price) €': f"€{profit_loss_eur:.2f}",
             'Profit/Loss (%) €': f"{profit_loss_percent_eur:.2f}%",
             'Profit/Loss + Dividends €': f"€{profit_loss_with_dividends_eur:.2f}",
-            'Total Profit/Loss (%) €': f"{total_profit_loss_percent_eur:.2f}%"
+            'Total Profit/Loss (%) €': f"{total_profit_loss_percent_eur:.2f}%",
+
+            'Realized P&L (lots)': f"{self.stock_data.get('realized_pl', 0.0):.2f}",
+            'Unrealized P&L (lots)': f"{self.lots['Unrealized P&L'].sum():.2f}"
         }
 
         return metrics
 
 
 
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Dividend Tracker')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--record', metavar='SNAPSHOT',
+                      help='Record all market data responses to a compressed snapshot file on exit')
+    mode.add_argument('--replay', metavar='SNAPSHOT',
+                      help='Serve market data from a recorded snapshot instead of the network')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Simulated latency in seconds per replayed response')
+    parser.add_argument('--transactions', metavar='PATH',
+                        help='Import broker exports from a directory or glob pattern on startup')
+    parser.add_argument('--portfolio', metavar='CSV',
+                        help='Portfolio CSV with symbol, shares and cost_basis columns (server mode)')
+    parser.add_argument('--serve', action='store_true',
+                        help='Run the local JSON API instead of the window')
+    parser.add_argument('--host', default='127.0.0.1', help='Address for the JSON API')
+    parser.add_argument('--port', type=int, default=8765, help='Port for the JSON API')
+    parser.add_argument('--refresh', type=float, default=300,
+                        help='Seconds between market data refreshes in server mode')
+    # Leave unknown arguments for Qt
+    return parser.parse_known_args(argv[1:])
+
+
+def run_server(args):
+    portfolio = pd.read_csv(args.portfolio).to_dict('records') if args.portfolio else []
+    dividend_history = []
+    ledger = load_transaction_files(args.transactions) if args.transactions else pd.DataFrame()
+    if not ledger.empty:
+        portfolio, dividend_history = holdings_from_ledger(ledger, 'FIFO', portfolio)
+    server = PortfolioAPIServer(portfolio, dividend_history, refresh_interval=args.refresh)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
+    args, qt_args = parse_args(sys.argv)
+    if args.replay:
+        start_replay(args.replay, latency=args.latency)
+    else:
+        # Each symbol is fetched once per session; --record also saves the responses
+        start_recording()
+    if args.serve:
+        run_server(args)
+        if args.record:
+            market_snapshot.save(args.record)
+        sys.exit(0)
+    app = QApplication(sys.argv[:1] + qt_args)
     window = DividendTracker()
+    if args.transactions:
+        window.process_transactions(load_transaction_files(args.transactions))
     window.show()
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+    if args.record:
+        market_snapshot.save(args.record)
+    sys.exit(exit_code)
@@ -0,0 +1,24 @@
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+from PyQt5.QtWidgets import QApplication
+
+import main
+
+
+@pytest.fixture(scope='session')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def market(monkeypatch):
+    """Replay from an empty snapshot that the test fills with the market data it needs."""
+    # Whatever use_snapshot sets is undone after the test
+    monkeypatch.setattr(main, 'market_snapshot', main.market_snapshot)
+    monkeypatch.setattr(main, 'market_data_mode', main.market_data_mode)
+    snapshot = main.MarketDataSnapshot()
+    main.use_snapshot(snapshot)
+    return snapshot
@@ -0,0 +1,14 @@
+"""Broker export rows shared by the tests."""
+import os
+
+SAMPLE_EXPORT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'from_2023-09-17_to_2024-09-16_MTcyNjUyMzc2MjQwMQ.csv'
+)
+
+
+def transaction(action, time, ticker, shares=None, total=None, price=None, withholding=None, order_id=None):
+    """One export row with the columns the ledger code reads."""
+    return {'Action': action, 'Time': time, 'Ticker': ticker, 'No. of shares': shares,
+            'Price / share': price, 'Withholding tax': withholding, 'Total': total, 'ID': order_id,
+            'Currency conversion fee': None}
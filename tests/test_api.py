@@ -0,0 +1,44 @@
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+import main
+
+
+@pytest.fixture
+def server(market):
+    market.store_price('AAA', 50.0)
+    # yfinance reports missing figures as NaN
+    market.store_overview('AAA', {'dividendRate': float('nan'), 'sector': 'Technology', 'currency': 'USD'})
+    market.store_dividends('AAA', pd.DataFrame({
+        'Date': pd.to_datetime(['2024-03-01', '2024-06-01']).tz_localize('America/New_York'),
+        'Dividend': [0.5, 0.5]
+    }))
+    portfolio = [{'symbol': 'AAA', 'shares': 10.0, 'cost_basis': 40.0, 'total_dividends': 0.0, 'transactions': []}]
+    return main.PortfolioAPIServer(portfolio)
+
+
+def render(server, endpoint):
+    async def run():
+        version = server.market_version()
+        # Same path as a request: the response itself is memoized under (endpoint, version)
+        return await asyncio.wait_for(
+            server.memoized((endpoint, version), lambda: server.render(endpoint, version)), timeout=5
+        )
+    return asyncio.run(run())
+
+
+def test_calendar_renders(server):
+    _, body = render(server, 'calendar')
+    records = json.loads(body)
+    assert [record['Dividend'] for record in records] == [5.0, 5.0]
+
+
+def test_holdings_have_no_nan(server):
+    _, body = render(server, 'holdings')
+    assert b'NaN' not in body
+    holding, = json.loads(body)
+    assert holding['market_value'] == 500.0
+    assert holding['annual_dividend'] is None
@@ -0,0 +1,18 @@
+import pytest
+
+import main
+
+
+def test_chart_view_is_abstract(app):
+    with pytest.raises(TypeError):
+        main.ChartView('Allocation')
+
+
+def test_pie_chart_reuses_wedges(app):
+    chart = main.PieChartView('Allocation')
+    chart.show_data(['O', 'TSN'], [1.0, 3.0])
+    wedges = chart.wedges
+    chart.show_data(['O', 'TSN'], [3.0, 1.0])
+    assert chart.wedges is wedges
+    assert wedges[0][0].theta2 == pytest.approx(270.0)
+    assert wedges[0][1].theta1 == pytest.approx(270.0)
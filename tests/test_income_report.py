@@ -0,0 +1,106 @@
+import pandas as pd
+import pytest
+
+import main
+from exports import transaction
+
+
+@pytest.fixture
+def snapshot(market):
+    market.store_overview('O', {'sector': 'Real Estate', 'dividendRate': 3.0})
+    market.store_overview('TSN', {'sector': 'Consumer Defensive'})
+    market.store_dividends('O', pd.DataFrame({
+        'Date': pd.date_range('2023-07-01', periods=12, freq='MS').tz_localize('America/New_York'),
+        'Dividend': [0.25] * 12
+    }))
+    market.store_dividends('TSN', pd.DataFrame({
+        'Date': pd.to_datetime(['2023-08-31', '2023-11-30', '2024-02-29', '2024-05-31']),
+        'Dividend': [0.48, 0.48, 0.49, 0.49]
+    }))
+    return market
+
+
+def _dividend(time, ticker, total):
+    return transaction('Dividend (Dividend)', time, ticker, total=total)
+
+
+@pytest.fixture
+def ledger():
+    return pd.DataFrame([
+        _dividend('2023-05-15 13:00:00', 'O', 2.0),
+        _dividend('2023-06-15 13:00:00', 'O', 2.5),
+        _dividend('2023-06-20 13:00:00.250', 'TSN', 4.0),
+        _dividend('2024-06-14 13:00:00', 'O', 3.0)
+    ])
+
+
+HOLDINGS = [
+    {'symbol': 'O', 'shares': 10.0},
+    {'symbol': 'TSN', 'shares': 4.0},
+    {'symbol': 'O', 'shares': 5.0}
+]
+
+
+def test_income_pivots(snapshot, ledger):
+    report = main.IncomeReportEngine().build(ledger, HOLDINGS, as_of='2024-06-30')
+
+    monthly = report['monthly_income'].set_index('Month')
+    assert list(monthly.index) == ['2023-05', '2023-06', '2024-06']
+    assert monthly.loc['2023-06', 'O'] == pytest.approx(2.5)
+    assert monthly.loc['2023-06', 'TSN'] == pytest.approx(4.0)
+    assert monthly.loc['2024-06', 'TSN'] == 0.0
+
+    yearly = report['yearly_sector_income'].set_index('Year')
+    assert yearly.loc[2023, 'Real Estate'] == pytest.approx(4.5)
+    assert yearly.loc[2023, 'Consumer Defensive'] == pytest.approx(4.0)
+    assert yearly.loc[2024, 'Real Estate'] == pytest.approx(3.0)
+
+    ttm = report['ttm_income'].set_index('Symbol')['TTM Income']
+    assert ttm.to_dict() == {'O': pytest.approx(3.0)}
+
+
+def test_forward_estimate(snapshot, ledger):
+    report = main.IncomeReportEngine().build(ledger, HOLDINGS, as_of='2024-06-30')
+
+    # Duplicate O rows add up; TSN has no forward rate and falls back to its trailing year
+    forward = report['forward_12m'].set_index('Symbol')
+    assert forward.loc['O', 'Shares'] == 15.0
+    assert forward.loc['O', 'Annual Dividend'] == pytest.approx(45.0)
+    assert forward.loc['TSN', 'Dividend Per Share'] == pytest.approx(0.48 + 0.48 + 0.49 + 0.49)
+    assert forward.loc['TSN', 'Annual Dividend'] == pytest.approx(4 * 1.94)
+
+    months = report['forward_monthly_income'].set_index('Month')
+    assert list(months.index) == [f'2024-{month:02d}' for month in range(7, 13)] + \
+        [f'2025-{month:02d}' for month in range(1, 7)]
+    assert months.loc['2025-02', 'TSN'] == pytest.approx(4 * 0.49)
+    assert months['O'].sum() == pytest.approx(15 * 0.25 * 12)
+
+
+def test_reports_are_memoized(snapshot, ledger):
+    engine = main.IncomeReportEngine()
+    report = engine.build(ledger, HOLDINGS, as_of='2024-06-30')
+    assert engine.build(ledger.copy(), [dict(stock) for stock in HOLDINGS], as_of='2024-06-30 18:00') is report
+
+    # Every input of the report invalidates it
+    assert engine.build(ledger.iloc[1:], HOLDINGS, as_of='2024-06-30') is not report
+    assert engine.build(ledger, HOLDINGS[:2], as_of='2024-06-30') is not report
+    later = engine.build(ledger, HOLDINGS, as_of='2025-06-30')
+    assert later is not report
+    assert later['ttm_income'].empty
+    snapshot.store_overview('O', {'sector': 'Real Estate', 'dividendRate': 3.12})
+    assert engine.build(ledger, HOLDINGS, as_of='2024-06-30') is not report
+
+
+def test_cache_is_bounded(snapshot, ledger):
+    engine = main.IncomeReportEngine()
+    for day in range(1, engine.CACHE_SIZE + 3):
+        engine.build(ledger, HOLDINGS, as_of=f'2024-06-{day:02d}')
+    assert len(engine.reports) == engine.CACHE_SIZE
+
+
+def test_report_writers_follow_installed_libraries(monkeypatch):
+    installed = {'pyarrow'}
+    monkeypatch.setattr(main.importlib.util, 'find_spec', lambda name: object() if name in installed else None)
+    assert main.report_writer_available('.csv')
+    assert main.report_writer_available('.parquet')
+    assert not main.report_writer_available('.xlsx')
@@ -0,0 +1,33 @@
+import pandas as pd
+import pytest
+from PyQt5.QtCore import Qt
+
+import main
+
+COLUMNS = [
+    ('Symbol', 'Symbol', main.format_text),
+    ('Shares', 'Shares', main.format_number())
+]
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({'Symbol': ['O', 'TSN', 'AAPL'], 'Shares': [4.0, 1.0, 9.0]})
+
+
+def symbols(table):
+    return [table.model.data(table.model.index(row, 0)) for row in range(table.model.rowCount())]
+
+
+def test_keeps_frame_order_until_sorted(app, frame):
+    table = main.LedgerTableView(frame, COLUMNS)
+    assert symbols(table) == ['O', 'TSN', 'AAPL']
+    assert table.view.horizontalHeader().sortIndicatorSection() == -1
+
+    table.view.sortByColumn(1, Qt.DescendingOrder)
+    assert symbols(table) == ['AAPL', 'O', 'TSN']
+
+
+def test_explicit_initial_sort(app, frame):
+    table = main.LedgerTableView(frame, COLUMNS, sort=(0, Qt.AscendingOrder))
+    assert symbols(table) == ['AAPL', 'O', 'TSN']
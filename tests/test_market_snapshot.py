@@ -0,0 +1,81 @@
+import gzip
+import json
+import math
+
+import pandas as pd
+import pytest
+
+import main
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    snapshot = main.MarketDataSnapshot()
+    snapshot.store_overview('O', {'longName': 'Realty Income', 'dividendRate': float('nan'), 'sector': 'Real Estate'})
+    snapshot.store_price('O', 52.5)
+    snapshot.store_price('DELISTED', None)
+    snapshot.store_dividends('O', pd.DataFrame({
+        # Either side of a daylight saving change
+        'Date': pd.to_datetime(['2024-02-29', '2024-03-28']).tz_localize('America/New_York'),
+        'Dividend': [0.2565, 0.257]
+    }))
+    snapshot.store_dividends('TSN', pd.DataFrame({'Date': pd.to_datetime(['2024-02-29']), 'Dividend': [0.49]}))
+    snapshot.store_dividends('NONE', pd.DataFrame())
+    path = tmp_path / 'market.json.gz'
+    snapshot.save(path)
+    return snapshot, path
+
+
+@pytest.fixture
+def offline(market, monkeypatch):
+    # Replay must never reach the network
+    for name in ('fetch_stock_overview', 'fetch_current_price', 'fetch_dividend_events'):
+        monkeypatch.setattr(main, name, lambda symbol: pytest.fail(f'network fetch for {symbol}'))
+
+
+def test_round_trip(recorded):
+    original, path = recorded
+    loaded = main.MarketDataSnapshot.load(path)
+
+    assert loaded.price('O') == 52.5
+    assert loaded.price('DELISTED') is None
+    overview = loaded.overview('O')
+    assert overview['longName'] == 'Realty Income'
+    assert math.isnan(overview['dividendRate'])
+
+    dates = loaded.dividend_events('O')['Date']
+    assert str(dates.dt.tz) == 'America/New_York'
+    pd.testing.assert_frame_equal(loaded.dividend_events('O'), original.dividend_events('O'))
+    pd.testing.assert_frame_equal(loaded.dividend_events('TSN'), original.dividend_events('TSN'))
+    assert loaded.dividend_events('TSN')['Date'].dt.tz is None
+    assert loaded.dividend_events('NONE').empty
+
+
+def test_replay_serves_snapshot_only(recorded, offline):
+    _, path = recorded
+    main.start_replay(str(path))
+
+    assert main.get_current_price('O') == 52.5
+    assert main.get_current_price('DELISTED') is None
+    assert main.get_stock_overview('O')['sector'] == 'Real Estate'
+    assert len(main.get_dividend_events('O')) == 2
+    # Symbols missing from the snapshot look like symbols without data
+    assert main.get_current_price('MSFT') is None
+    assert main.get_stock_overview('MSFT') == {}
+    assert main.get_dividend_events('MSFT').empty
+
+
+def test_replayed_frames_are_independent(recorded, offline):
+    _, path = recorded
+    main.start_replay(str(path))
+    events = main.get_dividend_events('O')
+    events['Dividend'] *= 100
+    assert main.get_dividend_events('O')['Dividend'].tolist() == [0.2565, 0.257]
+
+
+def test_unsupported_format(tmp_path):
+    path = tmp_path / 'future.json.gz'
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump({'format': main.MarketDataSnapshot.FORMAT_VERSION + 1, 'prices': {}}, f)
+    with pytest.raises(ValueError, match='Unsupported snapshot format'):
+        main.MarketDataSnapshot.load(path)
@@ -0,0 +1,70 @@
+import pytest
+
+import main
+
+
+@pytest.fixture
+def snapshot(market):
+    for symbol, price in [('O', 50.0), ('TSN', 60.0)]:
+        market.store_price(symbol, price)
+        market.store_overview(symbol, {'currency': 'USD', 'dividendRate': 3.0})
+    return market
+
+
+@pytest.fixture
+def portfolios():
+    return {
+        'Broker': [
+            {'symbol': 'O', 'shares': 10.0, 'cost_basis': 40.0, 'total_dividends': 6.0, 'sector': 'Real Estate'},
+            {'symbol': 'TSN', 'shares': 5.0, 'cost_basis': 70.0, 'total_dividends': 0.0, 'sector': 'Food'}
+        ],
+        'IRA': [
+            {'symbol': 'O', 'shares': 30.0, 'cost_basis': 60.0, 'total_dividends': 2.0, 'sector': 'Real Estate'}
+        ]
+    }
+
+
+def test_consolidated_rows_keep_their_accounts(snapshot, portfolios):
+    rows = main.consolidate_portfolios(portfolios)
+    assert [(stock['symbol'], stock['account']) for stock in rows] == [('O', 'Broker'), ('TSN', 'Broker'), ('O', 'IRA')]
+
+    _, rollup = main.value_portfolio(rows)
+    accounts = rollup.group_totals('account')
+    assert set(accounts) == {'Broker', 'IRA'}
+    assert accounts['Broker']['book_value'] == pytest.approx(400.0 + 350.0)
+    assert accounts['IRA']['current_value'] == pytest.approx(1500.0)
+    # The portfolios themselves are left untouched
+    assert 'account' not in portfolios['Broker'][0]
+
+
+def test_merged_holdings_and_valuations(snapshot, portfolios):
+    rows = main.consolidate_portfolios(portfolios)
+    o_holding = next(stock for stock in main.merge_holdings(rows) if stock['symbol'] == 'O')
+    assert o_holding['shares'] == 40.0
+    assert o_holding['cost_basis'] == pytest.approx((400.0 + 1800.0) / 40)
+    assert o_holding['account'] == main.CONSOLIDATED_VIEW
+
+    valuations, _ = main.value_portfolio(rows)
+    merged = {valuation['symbol']: valuation for valuation in main.merge_valuations(valuations)}
+    assert list(merged) == ['O', 'TSN']
+    o_value = merged['O']
+    assert o_value['market_value'] == pytest.approx(2000.0)
+    assert o_value['book_value'] == pytest.approx(2200.0)
+    assert o_value['cost_basis'] == pytest.approx(55.0)
+    assert o_value['unrealized_gain_percent'] == pytest.approx(-200.0 / 2200.0 * 100)
+    assert o_value['total_return'] == pytest.approx(-192.0 / 2200.0 * 100)
+    assert o_value['current_yoc'] == pytest.approx(3.0 / 55.0 * 100)
+    assert o_value['portfolio_alloc_live'] == pytest.approx(2000.0 / 2300.0 * 100)
+    assert merged['TSN']['account'] == 'Broker'
+    assert sum(valuation['portfolio_alloc_book'] for valuation in merged.values()) == pytest.approx(100.0)
+
+
+def test_value_portfolios(snapshot, portfolios):
+    results = main.value_portfolios(portfolios, max_workers=2)
+    assert list(results) == ['Broker', 'IRA']
+    for name, (valuations, rollup) in results.items():
+        assert len(valuations) == len(portfolios[name])
+        assert rollup.total()['book_value'] == pytest.approx(
+            sum(stock['shares'] * stock['cost_basis'] for stock in portfolios[name])
+        )
+    assert results['IRA'][0][0]['portfolio_alloc_live'] == pytest.approx(100.0)
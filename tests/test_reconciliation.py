@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+import main
+from exports import transaction
+
+
+@pytest.fixture
+def events(market):
+    market.store_dividends('O', pd.DataFrame({'Date': pd.to_datetime(['2024-03-01']), 'Dividend': [1.0]}))
+    market.store_dividends('TSN', pd.DataFrame({'Date': pd.to_datetime(['2024-03-05']), 'Dividend': [0.5]}))
+
+
+def reconcile(*rows):
+    return main.reconcile_dividends(pd.DataFrame(rows), as_of='2024-06-01').set_index('Symbol')['Status']
+
+
+def test_payments_for_untraded_symbols_are_matched(events):
+    # TSN was held before the ledger starts, so only its dividend appears
+    status = reconcile(
+        transaction('Market buy', '2024-01-02 10:00:00', 'O', 100, total=5000.0),
+        transaction('Dividend (Dividend)', '2024-03-15 13:00:00', 'O', 100, total=80.0, price=1.0, withholding=15.0),
+        transaction('Dividend (Dividend)', '2024-03-20 13:00:00', 'TSN', 4, total=1.6, price=0.5, withholding=0.3)
+    )
+    assert status['O'] == 'OK'
+    assert status['TSN'] == 'Share mismatch'
+
+
+def test_net_mismatch(events):
+    # Per-share amount and withholding each drift just inside tolerance
+    status = reconcile(
+        transaction('Market buy', '2024-01-02 10:00:00', 'O', 100, total=5000.0),
+        transaction('Dividend (Dividend)', '2024-03-15 13:00:00', 'O', 100, total=80.0, price=1.009, withholding=14.2)
+    )
+    assert status['O'] == 'Net mismatch'
+
+
+def test_symbols_on_different_exchanges(market):
+    market.store_dividends('O', pd.DataFrame({
+        'Date': pd.to_datetime(['2024-03-01']).tz_localize('America/New_York'), 'Dividend': [1.0]
+    }))
+    market.store_dividends('SAP.DE', pd.DataFrame({
+        'Date': pd.to_datetime(['2024-05-16']).tz_localize('Europe/Berlin'), 'Dividend': [2.2]
+    }))
+
+    events = main.collect_dividend_events(['O', 'SAP.DE'])
+    assert list(events['Ex-Date']) == [pd.Timestamp('2024-03-01'), pd.Timestamp('2024-05-16')]
+
+    status = reconcile(
+        transaction('Market buy', '2024-01-02 10:00:00', 'O', 100, total=5000.0),
+        transaction('Market buy', '2024-01-03 10:00:00', 'SAP.DE', 10, total=1500.0),
+        transaction('Dividend (Dividend)', '2024-03-15 13:00:00', 'O', 100, total=80.0, price=1.0, withholding=15.0),
+        transaction('Dividend (Dividend)', '2024-05-21 13:00:00', 'SAP.DE', 10, total=18.7, price=2.2, withholding=3.3)
+    )
+    assert status.to_dict() == {'O': 'OK', 'SAP.DE': 'OK'}
+
+
+@pytest.mark.parametrize('method', ['FIFO', 'LIFO'])
+def test_share_positions_agree_with_tax_lots(method):
+    # The first sell closes a position opened before the ledger starts
+    ledger = pd.DataFrame([
+        transaction('Market sell', '2024-01-02 10:00:00', 'O', 5, total=250.0),
+        transaction('Market buy', '2024-01-03 10:00:00', 'O', 10, total=500.0),
+        transaction('Market sell', '2024-02-01 10:00:00', 'O', 4, total=220.0),
+        transaction('Market sell', '2024-02-02 10:00:00', 'O', 8, total=440.0),
+        transaction('Market buy', '2024-03-01 10:00:00', 'O', 3, total=150.0),
+        transaction('Market buy', '2024-01-02 11:00:00', 'TSN', 2, total=120.0)
+    ])
+    positions = main.share_positions(ledger)
+    assert list(positions[positions['Symbol'] == 'O']['Position']) == [0.0, 10.0, 6.0, 0.0, 3.0]
+
+    open_lots, _ = main.build_tax_lots(ledger, method)
+    final = positions.groupby('Symbol')['Position'].last()
+    held = open_lots.groupby('Symbol')['Shares'].sum()
+    pd.testing.assert_series_equal(final, held, check_names=False, check_dtype=False)
@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+import main
+
+
+@pytest.fixture
+def snapshot(market):
+    for symbol, price in [('O', 50.0), ('TSN', 60.0)]:
+        market.store_price(symbol, price)
+        market.store_overview(symbol, {'currency': 'USD'})
+    return market
+
+
+SECTORS = {'O': 'Real Estate', 'TSN': 'Consumer Defensive'}
+
+
+def holding(symbol, shares, cost_basis):
+    return {'symbol': symbol, 'shares': shares, 'cost_basis': cost_basis, 'total_dividends': 0.0,
+            'sector': SECTORS[symbol]}
+
+
+def test_duplicate_symbol_rows_are_kept(snapshot):
+    portfolio = [holding('O', 10.0, 40.0), holding('TSN', 5.0, 70.0), holding('O', 2.0, 45.0)]
+    valuations, rollup = main.value_portfolio(portfolio)
+
+    assert len(valuations) == 3
+    assert rollup.total()['count'] == 3
+    assert rollup.total()['current_value'] == pytest.approx(12 * 50.0 + 5 * 60.0)
+    assert rollup.total('sector', 'Real Estate')['book_value'] == pytest.approx(400.0 + 90.0)
+    assert sum(valuation['portfolio_alloc_live'] for valuation in valuations) == pytest.approx(100.0)
+
+
+def test_price_refresh_applies_deltas(snapshot, monkeypatch):
+    portfolio = [holding('O', 10.0, 40.0), holding('TSN', 5.0, 70.0)]
+    _, rollup = main.value_portfolio(portfolio)
+
+    updated = []
+    update_holding = rollup.update_holding
+    monkeypatch.setattr(rollup, 'update_holding', lambda key, **values: updated.append(key) or update_holding(key, **values))
+    snapshot.store_price('O', 55.0)
+    main.value_portfolio(portfolio, rollup)
+
+    assert updated == [(0, 'O'), (1, 'TSN')]
+    assert rollup.total()['current_value'] == pytest.approx(10 * 55.0 + 5 * 60.0)
+    assert rollup.total('sector', 'Real Estate')['current_value'] == pytest.approx(550.0)
+
+    # Removing a row drops it from every group
+    main.value_portfolio(portfolio[1:], rollup)
+    assert rollup.total()['count'] == 1
+    assert list(rollup.group_totals('sector')) == ['Consumer Defensive']
+
+
+def test_blank_csv_groups_share_unknown(snapshot, tmp_path):
+    path = tmp_path / 'portfolio.csv'
+    path.write_text('symbol,shares,cost_basis,sector,account\nO,10,40,,\nTSN,5,70,,\n')
+    portfolio = pd.read_csv(path).to_dict('records')
+    valuations, rollup = main.value_portfolio(portfolio)
+
+    assert list(rollup.group_totals('sector')) == ['Unknown']
+    assert list(rollup.group_totals('account')) == ['Default']
+    assert [valuation['sector_alloc_live'] for valuation in valuations] == \
+        pytest.approx([500.0 / 800.0 * 100, 300.0 / 800.0 * 100])
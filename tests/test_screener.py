@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+from PyQt5.QtCore import Qt
+
+import main
+
+
+@pytest.fixture
+def universe():
+    return pd.DataFrame({
+        'Symbol': ['AAA', 'BBB', 'CCC'],
+        'Name': ['', '', ''],
+        'Sector': ['Utilities', 'Energy', 'Utilities'],
+        'Price': [10.0, 20.0, 30.0],
+        'Dividend Rate': [0.5, 2.0, 0.3],
+        'Yield %': [5.0, 10.0, 1.0],
+        'Payout Ratio': [0.5, 0.8, 0.2],
+        'Growth Streak': [3, 0, 10],
+        'Payments': [4, 12, 4],
+        'Frequency': ['Quarterly', 'Monthly', 'Quarterly']
+    })
+
+
+def test_results_keep_screener_ranking(app, universe, market):
+    window = main.ScreenerWindow()
+    window.set_universe(universe)
+    model = window.results.model
+
+    def symbols():
+        return [model.data(model.index(row, 0)) for row in range(model.rowCount())]
+
+    assert symbols() == ['BBB', 'AAA', 'CCC']
+    header = window.results.view.horizontalHeader()
+    assert (header.sortIndicatorSection(), header.sortIndicatorOrder()) == (window.rank_section, Qt.DescendingOrder)
+
+    # A header sort lasts until the next screen, which is ranked again
+    window.results.view.sortByColumn(0, Qt.AscendingOrder)
+    assert symbols() == ['AAA', 'BBB', 'CCC']
+    window.min_streak_input.setText('1')
+    window.run_screen()
+    assert symbols() == ['AAA', 'CCC']
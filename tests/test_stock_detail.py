@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+import main
+from exports import SAMPLE_EXPORT
+
+
+@pytest.fixture
+def tracker(app, market):
+    market.store_price('O', 50.0)
+    tracker = main.DividendTracker()
+    tracker.ledger = main.load_transaction_files(SAMPLE_EXPORT)
+    tracker.portfolio, tracker.dividend_history = main.holdings_from_ledger(tracker.ledger)
+    return tracker
+
+
+def test_symbol_ledger_slices_by_ticker(tracker):
+    rows = tracker.symbol_ledger('TSN')
+    assert len(rows) > 0
+    assert (rows['Ticker'] == 'TSN').all()
+    index = tracker.ledger_index
+    tracker.symbol_ledger('O')
+    # The ticker index is reused until the ledger changes
+    assert tracker.ledger_index is index
+    assert tracker.symbol_ledger('MSFT').empty
+
+
+def test_detail_window_reads_symbol_slice(tracker):
+    stock = tracker.portfolio[0]
+    window = main.StockDetailWindow(stock, tracker.symbol_ledger('O'))
+
+    ledger = tracker.ledger
+    expected = main.ledger_purchases(ledger[ledger['Ticker'] == 'O'])
+    assert len(window.transactions) == len(expected) == 4
+    assert window.transactions['Consideration $'].sum() == pytest.approx(expected['Consideration $'].sum())
+    assert window.dividends['Dividend Received $'].sum() == pytest.approx(stock['total_dividends'])
+    metrics = window.calculate_metrics()
+    assert metrics['Total Value $'] == f"${expected['Consideration $'].sum():.2f}"
+
+
+def test_detail_window_without_ledger(tracker):
+    stock = {'symbol': 'O', 'shares': 2.0, 'cost_basis': 40.0}
+    window = main.StockDetailWindow(stock)
+    assert window.transactions.empty
+    assert window.calculate_metrics()['Current Value $'] == '$100.00'
+
+
+def test_consolidated_ledger_is_merged_once(tracker):
+    tracker.portfolios['IRA'] = []
+    tracker.ledgers['IRA'] = tracker.ledger.iloc[:10]
+    tracker.dividend_histories['IRA'] = []
+    tracker.active_portfolio = main.CONSOLIDATED_VIEW
+
+    merged = tracker.ledger
+    assert len(merged) == 53
+    assert tracker.ledger is merged
+    rows = tracker.symbol_ledger('O')
+    index = tracker.ledger_index
+    tracker.symbol_ledger('TSN')
+    assert tracker.ledger_index is index
+    assert (rows['Ticker'] == 'O').all()
+
+    # Replacing any portfolio's ledger invalidates the merge
+    tracker.ledgers['IRA'] = tracker.ledgers['Main'].iloc[:0]
+    assert tracker.ledger is not merged
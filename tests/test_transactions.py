@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+import main
+from exports import SAMPLE_EXPORT, transaction
+
+
+@pytest.fixture
+def split_export():
+    # 2-for-1 split of AAA between the buys and the sell; BBB never splits
+    return pd.DataFrame([
+        transaction('Market buy', '2024-01-02 10:00:00.123', 'AAA', 10, total=1000.0, order_id='b1'),
+        transaction('Market buy', '2024-02-01 10:00:00', 'AAA', 10, total=1200.0, order_id='b2'),
+        transaction('Market buy', '2024-02-01 11:00:00', 'BBB', 5, total=500.0, order_id='b3'),
+        transaction('Stock split close', '2024-03-01 07:00:00', 'AAA', 20, order_id='s1'),
+        transaction('Stock split open', '2024-03-01 07:00:00.5', 'AAA', 40, order_id='s2'),
+        transaction('Market sell', '2024-04-01 10:00:00', 'AAA', 30, total=1800.0, order_id='x1'),
+    ])
+
+
+@pytest.mark.parametrize('method, open_cost, realized_cost', [
+    ('FIFO', 600.0, 1600.0),
+    ('LIFO', 500.0, 1700.0),
+])
+def test_split_adjusted_lot_matching(split_export, method, open_cost, realized_cost):
+    open_lots, realized = main.build_tax_lots(split_export, method)
+
+    aaa = open_lots[open_lots['Symbol'] == 'AAA']
+    assert aaa['Shares'].sum() == pytest.approx(10.0)
+    assert aaa['Cost'].sum() == pytest.approx(open_cost)
+    bbb = open_lots[open_lots['Symbol'] == 'BBB']
+    assert bbb['Shares'].sum() == pytest.approx(5.0)
+
+    assert realized['Shares'].sum() == pytest.approx(30.0)
+    assert realized['Cost'].sum() == pytest.approx(realized_cost)
+    assert realized['Realized P&L'].sum() == pytest.approx(1800.0 - realized_cost)
+
+
+def test_import_sample_export(market):
+    ledger = main.load_transaction_files(SAMPLE_EXPORT)
+    assert len(ledger) == 53
+
+    portfolio, dividend_history = main.holdings_from_ledger(ledger)
+    assert [stock['symbol'] for stock in portfolio] == ['O']
+    assert portfolio[0]['shares'] == pytest.approx(10.093635)
+    assert len(portfolio[0]['lots']) == 4
+    assert len(dividend_history) == 16
+    o_dividends = sum(item['Dividend'] for item in dividend_history if item['Symbol'] == 'O')
+    assert portfolio[0]['total_dividends'] == pytest.approx(o_dividends)
+    # Individual purchases and payments are read from the ledger, not copied onto holdings
+    assert 'transactions' not in portfolio[0] and 'dividends' not in portfolio[0]
+
+
+def test_reimporting_overlapping_export_is_idempotent(market):
+    once = main.load_transaction_files(SAMPLE_EXPORT)
+    twice = main.load_transaction_files([SAMPLE_EXPORT, SAMPLE_EXPORT])
+    assert len(twice) == len(once)